@@ -0,0 +1,325 @@
+"""Local stand-in for the camillagui backend and the CamillaDSP websocket.
+
+Serves the endpoints used by the integration with configurable latency,
+jitter, error rate and config size, and counts the requests per endpoint.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections import Counter
+from dataclasses import dataclass, field
+import json
+import random
+import time
+
+from aiohttp import WSMsgType, web
+
+STATES = {
+    "RUNNING": "Running",
+    "PAUSED": "Paused",
+    "INACTIVE": "Inactive",
+    "STALLED": "Stalled",
+    "STARTING": "Starting",
+}
+
+
+@dataclass
+class FakeOptions:
+    latency: float = 0.005
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    config_size: int = 4096
+    configs: int = 5
+    channels: int = 2
+
+
+@dataclass
+class FakeState:
+    state: str = "RUNNING"
+    capturerate: int = 48000
+    volume: float = -20.0
+    mute: bool = False
+    aux_volume: list[float] = field(default_factory=lambda: [0.0] * 4)
+    aux_mute: list[bool] = field(default_factory=lambda: [False] * 4)
+    active: str = "config_0.yml"
+    configs: dict[str, dict] = field(default_factory=dict)
+    modified: dict[str, float] = field(default_factory=dict)
+
+
+class FakeCamillaDSP:
+    """One simulated CamillaDSP instance with camillagui backend."""
+
+    def __init__(self, options: FakeOptions | None = None, seed: int | None = None) -> None:
+        self.options = options or FakeOptions()
+        self.random = random.Random(seed)
+        self.state = FakeState()
+        self.requests: Counter[str] = Counter()
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.url = ""
+        self.ws_url = ""
+        self._runner: web.AppRunner | None = None
+
+        for index in range(self.options.configs):
+            name = f"config_{index}.yml"
+            self.state.configs[name] = make_config(name, self.options.config_size)
+            self.state.modified[name] = time.time()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        app = web.Application()
+        app.router.add_get("/api/status", self._status)
+        app.router.add_get("/api/getparam/{name}", self._get_param)
+        app.router.add_post("/api/setparam/{name}", self._set_param)
+        app.router.add_get("/api/getlistparam/{name}", self._get_list_param)
+        app.router.add_post("/api/setparamindex/{name}/{index}", self._set_param_index)
+        app.router.add_get("/api/getactiveconfigfile", self._get_active_config)
+        app.router.add_post("/api/setactiveconfigfile", self._set_active_config)
+        app.router.add_get("/api/storedconfigs", self._stored_configs)
+        app.router.add_get("/api/getconfigfile", self._get_config_file)
+        app.router.add_post("/api/setconfig", self._set_config)
+        app.router.add_get("/ws", self._websocket)
+
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        host, port = self._runner.addresses[0][:2]
+        self.url = f"http://{host}:{port}"
+        self.ws_url = f"ws://{host}:{port}/ws"
+        return self.url
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _delay(self) -> bool:
+        """Simulate network and backend latency, return False to fail the request."""
+        delay = self.options.latency + self.random.uniform(-self.options.jitter, self.options.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return self.random.random() >= self.options.error_rate
+
+    async def _reply(self, endpoint: str, body: str) -> web.Response:
+        self.requests[endpoint] += 1
+        if not await self._delay():
+            return web.Response(status=500, text="Simulated error")
+        self.bytes_sent += len(body)
+        return web.Response(text=body)
+
+    async def _status(self, request: web.Request) -> web.Response:
+        return await self._reply("status", json.dumps(self.status_payload()))
+
+    def status_payload(self) -> dict:
+        levels = self.signal_levels()
+        return {
+            "cdsp_status": self.state.state,
+            "capturerate": self.state.capturerate,
+            "rateadjust": 1.0 + self.random.uniform(-0.001, 0.001),
+            "bufferlevel": self.random.randint(500, 1500),
+            "clippedsamples": 0,
+            "processingload": self.random.uniform(5, 25),
+            "playbacksignalrms": levels["playback_rms"],
+            "playbacksignalpeak": levels["playback_peak"],
+            "capturesignalrms": levels["capture_rms"],
+            "capturesignalpeak": levels["capture_peak"],
+        }
+
+    def signal_levels(self) -> dict[str, list[float]]:
+        rms = [self.random.uniform(-40, -10) for _ in range(self.options.channels)]
+        return {
+            "playback_rms": rms,
+            "playback_peak": [value + 6 for value in rms],
+            "capture_rms": rms,
+            "capture_peak": [value + 6 for value in rms],
+        }
+
+    async def _get_param(self, request: web.Request) -> web.Response:
+        name = request.match_info["name"]
+        value = {"volume": self.state.volume, "mute": self.state.mute}.get(name, "")
+        return await self._reply(f"getparam/{name}", str(value))
+
+    async def _set_param(self, request: web.Request) -> web.Response:
+        name = request.match_info["name"]
+        data = await request.text()
+        self.bytes_received += len(data)
+        if name == "volume":
+            self.state.volume = float(data)
+        elif name == "mute":
+            self.state.mute = data == "True"
+        return await self._reply(f"setparam/{name}", "OK")
+
+    def faders(self) -> list[dict]:
+        return [{"volume": self.state.volume, "mute": self.state.mute}] + [
+            {"volume": volume, "mute": mute}
+            for volume, mute in zip(self.state.aux_volume, self.state.aux_mute)
+        ]
+
+    async def _get_list_param(self, request: web.Request) -> web.Response:
+        name = request.match_info["name"]
+        value = self.faders() if name == "faders" else []
+        return await self._reply(f"getlistparam/{name}", json.dumps(value))
+
+    async def _set_param_index(self, request: web.Request) -> web.Response:
+        name = request.match_info["name"]
+        data = await request.text()
+        self.bytes_received += len(data)
+        self._set_fader(name, int(request.match_info["index"]), data)
+        return await self._reply(f"setparamindex/{name}", "OK")
+
+    def _set_fader(self, name: str, index: int, value) -> None:
+        if name == "volume":
+            if index == 0:
+                self.state.volume = float(value)
+            else:
+                self.state.aux_volume[index - 1] = float(value)
+        elif name == "mute":
+            mute = value == "True" if isinstance(value, str) else bool(value)
+            if index == 0:
+                self.state.mute = mute
+            else:
+                self.state.aux_mute[index - 1] = mute
+
+    async def _get_active_config(self, request: web.Request) -> web.Response:
+        body = json.dumps({"configFileName": self.state.active,
+                           "config": self.state.configs.get(self.state.active)})
+        return await self._reply("getactiveconfigfile", body)
+
+    async def _set_active_config(self, request: web.Request) -> web.Response:
+        data = await request.text()
+        self.bytes_received += len(data)
+        name = json.loads(data)["name"]
+        if name in self.state.configs:
+            self.state.active = name
+        return await self._reply("setactiveconfigfile", "OK")
+
+    async def _stored_configs(self, request: web.Request) -> web.Response:
+        body = json.dumps([
+            {"name": name, "lastModified": self.state.modified[name]}
+            for name in self.state.configs
+        ])
+        return await self._reply("storedconfigs", body)
+
+    async def _get_config_file(self, request: web.Request) -> web.Response:
+        name = request.query.get("name", "")
+        return await self._reply("getconfigfile", json.dumps(self.state.configs.get(name)))
+
+    async def _set_config(self, request: web.Request) -> web.Response:
+        data = await request.text()
+        self.bytes_received += len(data)
+        return await self._reply("setconfig", "OK")
+
+    async def _websocket(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        async for msg in ws:
+            if msg.type != WSMsgType.TEXT:
+                continue
+            self.bytes_received += len(msg.data)
+            message = json.loads(msg.data)
+            if isinstance(message, str):
+                command, value = message, None
+            else:
+                command, value = next(iter(message.items()))
+            self.requests[f"ws/{command}"] += 1
+            if await self._delay():
+                reply = {"result": "Ok", "value": self._ws_command(command, value)}
+            else:
+                reply = {"result": "Error", "value": "Simulated error"}
+            body = json.dumps({command: reply})
+            self.bytes_sent += len(body)
+            await ws.send_str(body)
+        return ws
+
+    def _ws_command(self, command: str, value):
+        match command:
+            case "GetState":
+                return STATES.get(self.state.state, "Inactive")
+            case "GetCaptureRate":
+                return self.state.capturerate
+            case "GetProcessingLoad":
+                return self.random.uniform(5, 25)
+            case "GetRateAdjust":
+                return 1.0 + self.random.uniform(-0.001, 0.001)
+            case "GetBufferLevel":
+                return self.random.randint(500, 1500)
+            case "GetClippedSamples":
+                return 0
+            case "GetVolume":
+                return self.state.volume
+            case "SetVolume":
+                self.state.volume = float(value)
+            case "GetMute":
+                return self.state.mute
+            case "SetMute":
+                self.state.mute = bool(value)
+            case "GetFaders":
+                return self.faders()
+            case "SetFaderVolume":
+                self._set_fader("volume", value[0], value[1])
+            case "SetFaderMute":
+                self._set_fader("mute", value[0], value[1])
+            case "GetConfigFilePath":
+                return f"/configs/{self.state.active}"
+            case "SetConfigFilePath":
+                name = value.rsplit("/", 1)[-1]
+                if name in self.state.configs:
+                    self.state.active = name
+            case "GetConfigJson":
+                return json.dumps(self.state.configs.get(self.state.active))
+            case "PatchConfig":
+                _merge(self.state.configs[self.state.active], value)
+            case "GetSignalLevels":
+                return self.signal_levels()
+        return None
+
+
+def _merge(config: dict, patch: dict) -> None:
+    """Merge a patch like CamillaDSP does: objects are merged, everything else replaced."""
+    for key, value in patch.items():
+        if isinstance(value, dict) and isinstance(config.get(key), dict):
+            _merge(config[key], value)
+        else:
+            config[key] = value
+
+
+def make_config(name: str, size: int) -> dict:
+    """Build a config with filters until its JSON is about size bytes."""
+    config: dict = {
+        "title": name,
+        "devices": {"samplerate": 48000, "chunksize": 1024, "volume_ramp_time": 200},
+        "filters": {},
+        "mixers": {},
+        "pipeline": [],
+    }
+    index = 0
+    while len(json.dumps(config)) < size:
+        config["filters"][f"peq_{index}"] = {
+            "type": "Biquad",
+            "parameters": {"type": "Peaking", "freq": 100 + index, "q": 1.0, "gain": 0.0},
+        }
+        index += 1
+    return config
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    fake = FakeCamillaDSP(FakeOptions(latency=args.latency, jitter=args.jitter,
+                                      error_rate=args.error_rate, config_size=args.config_size))
+    url = await fake.start(args.host, args.port)
+    print(f"Fake CamillaDSP listening on {url} (websocket {fake.ws_url})")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await fake.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5005)
+    parser.add_argument("--latency", type=float, default=0.005)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--config-size", type=int, default=4096)
+    asyncio.run(_serve(parser.parse_args()))
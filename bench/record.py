@@ -0,0 +1,98 @@
+"""Record the HTTP exchanges with a camillagui backend into a trace file.
+
+Runs a proxy in front of a live device. Point the integration (or the
+benchmarks) at the proxy URL instead of the device, every request is
+forwarded and written to the trace with its timing:
+
+    python -m bench.record --target http://dsp-kitchen:5005 --port 5006 --output kitchen.trace.gz
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+import aiohttp
+from aiohttp import web
+
+from .trace import Exchange, TraceWriter
+
+
+class RecordingProxy:
+    """Forward /api requests to a camillagui backend and record them."""
+
+    def __init__(self, target: str, writer: TraceWriter) -> None:
+        self.target = target.rstrip("/")
+        self.writer = writer
+        self.url = ""
+        self._started = time.monotonic()
+        self._session: aiohttp.ClientSession | None = None
+        self._runner: web.AppRunner | None = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        self._session = aiohttp.ClientSession()
+        app = web.Application()
+        app.router.add_route("*", "/api/{endpoint:.*}", self._forward)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        host, port = self._runner.addresses[0][:2]
+        self.url = f"http://{host}:{port}"
+        self._started = time.monotonic()
+        return self.url
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _forward(self, request: web.Request) -> web.Response:
+        endpoint = request.match_info["endpoint"]
+        if request.query_string:
+            endpoint = f"{endpoint}?{request.query_string}"
+        body = await request.text() if request.can_read_body else None
+
+        started = time.monotonic()
+        try:
+            async with self._session.request(request.method, f"{self.target}/api/{endpoint}", data=body) as res:
+                text = await res.text()
+                status = res.status
+        except (aiohttp.ClientError, TimeoutError) as err:
+            text, status = str(err), 502
+        latency = time.monotonic() - started
+
+        self.writer.write(Exchange(t=started - self._started, method=request.method, endpoint=endpoint,
+                                   status=status, request=body, response=text, latency=latency))
+        return web.Response(status=status, text=text)
+
+
+async def _record(args: argparse.Namespace) -> None:
+    writer = TraceWriter(args.output)
+    proxy = RecordingProxy(args.target, writer)
+    url = await proxy.start(args.host, args.port)
+    print(f"Recording {args.target} through {url} to {args.output}, Ctrl+C to stop")
+    try:
+        if args.duration:
+            await asyncio.sleep(args.duration)
+        else:
+            await asyncio.Event().wait()
+    finally:
+        await proxy.stop()
+        writer.close()
+        print(f"Recorded {writer.exchanges} exchanges")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", required=True, help="URL of the camillagui backend")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5006)
+    parser.add_argument("--duration", type=float, default=0, help="seconds to record, 0 until interrupted")
+    parser.add_argument("--output", required=True, help="trace file to write")
+    try:
+        asyncio.run(_record(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
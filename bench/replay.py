@@ -0,0 +1,253 @@
+"""Replay a recorded trace to many virtual CamillaDSP instances.
+
+Serves the responses of a trace recorded with bench.record, in recorded
+order per endpoint and with the recorded latencies (divided by --speed),
+to any number of virtual instances. Each instance is driven by a
+CDSPDataUpdateCoordinator on the shared poll scheduler and a CDSPMediaPlayer
+on an entity platform, as in Home Assistant. For every instance count the
+event loop lag, requests and memory per instance are reported as JSON:
+
+    python -m bench.replay kitchen.trace.gz --instances 10,50,100,200 --speed 4 --duration 20
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections import Counter
+from datetime import timedelta
+import json
+import logging
+import platform
+import random
+import tempfile
+import time
+import tracemalloc
+
+from aiohttp import web
+
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.entity_platform import EntityPlatform
+
+from custom_components.camilladsp.cdsp import CDSPClient
+from custom_components.camilladsp.const import DOMAIN
+from custom_components.camilladsp.coordinator import CDSPDataUpdateCoordinator
+from custom_components.camilladsp.media_player import ENTITY_DESC, CDSPMediaPlayer
+from custom_components.camilladsp.scheduler import CDSPPollScheduler
+
+from .run_bench import summarize
+from .trace import Exchange, read_trace
+
+LOGGER = logging.getLogger(__name__)
+
+
+class ReplayCamillaDSP:
+    """Serve a trace to virtual instances at /i/<n>/api/<endpoint>.
+
+    Every instance has its own position in the recorded responses of each
+    endpoint and starts over at the end of the trace.
+    """
+
+    def __init__(self, exchanges: list[Exchange], speed: float = 1.0) -> None:
+        self.speed = speed
+        self._responses: dict[tuple[str, str], list[Exchange]] = {}
+        for exchange in exchanges:
+            self._responses.setdefault((exchange.method, exchange.endpoint), []).append(exchange)
+        self._cursors: dict[int, Counter[tuple[str, str]]] = {}
+        self.requests: Counter[int] = Counter()
+        self.missing: Counter[str] = Counter()
+        self.url = ""
+        self._runner: web.AppRunner | None = None
+
+    def instance_url(self, instance: int) -> str:
+        return f"{self.url}/i/{instance}"
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        app = web.Application()
+        app.router.add_route("*", "/i/{instance:\\d+}/api/{endpoint:.*}", self._serve)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        host, port = self._runner.addresses[0][:2]
+        self.url = f"http://{host}:{port}"
+        return self.url
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _serve(self, request: web.Request) -> web.Response:
+        instance = int(request.match_info["instance"])
+        endpoint = request.match_info["endpoint"]
+        if request.query_string:
+            endpoint = f"{endpoint}?{request.query_string}"
+        self.requests[instance] += 1
+
+        key = (request.method, endpoint)
+        if (responses := self._responses.get(key)) is None:
+            self.missing[f"{request.method} {endpoint}"] += 1
+            return web.Response(status=404, text="Not recorded")
+
+        cursors = self._cursors.setdefault(instance, Counter())
+        exchange = responses[cursors[key] % len(responses)]
+        cursors[key] += 1
+        if exchange.latency > 0:
+            await asyncio.sleep(exchange.latency / self.speed)
+        return web.Response(status=exchange.status, text=exchange.response)
+
+
+async def replay_instances(hass: HomeAssistant, exchanges: list[Exchange], instances: int, speed: float,
+                           duration: float, interval: float, command_rate: float) -> dict:
+    """Run instances against the replayed trace and measure the load on the event loop."""
+    server = ReplayCamillaDSP(exchanges, speed)
+    await server.start()
+    memory_before = tracemalloc.get_traced_memory()[0]
+
+    scheduler = CDSPPollScheduler(hass)
+    coordinators: list[CDSPDataUpdateCoordinator] = []
+    unregister = []
+    players: list[CDSPMediaPlayer] = []
+    for index in range(instances):
+        cdsp = CDSPClient(hass, server.instance_url(index))
+        coordinator = CDSPDataUpdateCoordinator(
+            hass, cdsp, timedelta(seconds=interval),
+            fast_interval=interval, slow_interval=interval, max_backoff=interval,
+        )
+        coordinators.append(coordinator)
+    await asyncio.gather(*(coordinator.async_refresh() for coordinator in coordinators))
+
+    for index, coordinator in enumerate(coordinators):
+        unregister.append(scheduler.async_register(coordinator))
+        player = CDSPMediaPlayer(f"replay_{index}", coordinator, ENTITY_DESC, -50, 0, 1)
+        # Without registries, the entity is added like one without unique id.
+        player._attr_unique_id = None
+        player._attr_device_info = None
+        player.entity_id = f"media_player.replay_{index}"
+        players.append(player)
+
+    entity_platform = EntityPlatform(
+        hass=hass, logger=LOGGER, domain="media_player", platform_name=DOMAIN,
+        platform=None, scan_interval=timedelta(seconds=interval), entity_namespace=None,
+    )
+    await entity_platform.async_add_entities(players)
+    memory_setup = tracemalloc.get_traced_memory()[0]
+
+    state_writes = 0
+
+    @callback
+    def count_state_write(event: Event) -> None:
+        nonlocal state_writes
+        state_writes += 1
+
+    remove_listener = hass.bus.async_listen(EVENT_STATE_CHANGED, count_state_write)
+
+    pending: set[asyncio.Task] = set()
+
+    async def send_commands() -> None:
+        # Volume changes on random instances, like users and automations would.
+        rng = random.Random(instances)
+        while True:
+            await asyncio.sleep(rng.expovariate(command_rate))
+            player = rng.choice(players)
+            task = hass.async_create_task(player.async_set_volume_level(rng.random()))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+
+    commands = hass.async_create_background_task(send_commands(), "replay commands") if command_rate > 0 else None
+
+    lags: list[float] = []
+    probe = 0.01
+    requests_before = sum(server.requests.values())
+    deadline = time.perf_counter() + duration
+    try:
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            await asyncio.sleep(probe)
+            lags.append(max(0.0, time.perf_counter() - started - probe))
+        memory_run = tracemalloc.get_traced_memory()[0]
+    finally:
+        if commands is not None:
+            commands.cancel()
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        remove_listener()
+        await entity_platform.async_reset()
+        for remove in unregister:
+            remove()
+        scheduler.async_shutdown()
+        for coordinator in coordinators:
+            await coordinator.async_shutdown()
+            await coordinator.cdsp.async_close()
+        await server.stop()
+
+    requests = sum(server.requests.values()) - requests_before
+    poll_p95 = [coordinator.poll_durations.percentile(0.95) for coordinator in coordinators]
+    poll_p95 = [value for value in poll_p95 if value is not None]
+    return {
+        "instances": instances,
+        "duration_s": duration,
+        "requests": requests,
+        "requests_per_s": round(requests / duration, 2),
+        "requests_per_instance_s": round(requests / duration / instances, 3),
+        "state_writes": state_writes,
+        "not_recorded": dict(server.missing),
+        "loop_lag": summarize(lags),
+        "poll_duration_p95_ms": max(poll_p95) if poll_p95 else None,
+        "memory_per_instance_kb": round((memory_setup - memory_before) / instances / 1024, 2),
+        "memory_growth_kb": round((memory_run - memory_setup) / 1024, 2),
+    }
+
+
+async def run(args: argparse.Namespace) -> dict:
+    exchanges = list(read_trace(args.trace))
+    if not exchanges:
+        raise SystemExit(f"No exchanges in {args.trace}")
+    counts = [int(count) for count in args.instances.split(",")]
+
+    tracemalloc.start()
+    results = []
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        try:
+            for count in counts:
+                results.append(await replay_instances(hass, exchanges, count, args.speed, args.duration,
+                                                      args.interval, args.command_rate))
+        finally:
+            await hass.async_stop(force=True)
+    tracemalloc.stop()
+
+    return {
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "trace": args.trace,
+        "exchanges": len(exchanges),
+        "recorded_s": round(exchanges[-1].t - exchanges[0].t, 3),
+        "speed": args.speed,
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("trace", help="trace file written by bench.record")
+    parser.add_argument("--instances", default="10,50,100", help="comma separated instance counts")
+    parser.add_argument("--speed", type=float, default=1.0, help="divide recorded latencies by this factor")
+    parser.add_argument("--duration", type=float, default=20, help="seconds per instance count")
+    parser.add_argument("--interval", type=float, default=2, help="poll interval in seconds")
+    parser.add_argument("--command-rate", type=float, default=1.0, help="volume commands per second, all instances")
+    parser.add_argument("--output", help="write results to this file instead of stdout")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""Benchmarks for the CamillaDSP client against local fake instances.
+
+Run from the repository root with Home Assistant installed:
+
+    python -m bench.run_bench --output bench_output.json
+
+Results are written as JSON, so runs can be compared over time.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from datetime import timedelta
+import json
+import platform
+import statistics
+import tempfile
+import time
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.camilladsp.cdsp import CDSPClient
+from custom_components.camilladsp.configs import CDSPConfigCache
+from custom_components.camilladsp.const import TRANSPORT_WEBSOCKET
+from custom_components.camilladsp.coordinator import CDSPDataUpdateCoordinator
+from custom_components.camilladsp.discovery import async_discover, parse_hosts
+from custom_components.camilladsp.scheduler import CDSPPollScheduler
+
+from .fake_cdsp import FakeCamillaDSP, FakeOptions
+
+
+def summarize(samples: list[float]) -> dict[str, float]:
+    """Latency summary in milliseconds."""
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+def client_url(fake: FakeCamillaDSP, transport: str) -> str:
+    return fake.ws_url if transport == TRANSPORT_WEBSOCKET else fake.url
+
+
+async def bench_update(hass: HomeAssistant, options: FakeOptions, transport: str, cycles: int) -> dict:
+    """Latency of CDSPClient.update() cycles."""
+    fake = FakeCamillaDSP(options, seed=1)
+    await fake.start()
+    cdsp = CDSPClient(hass, client_url(fake, transport), transport)
+    try:
+        samples = []
+        for _ in range(cycles):
+            started = time.perf_counter()
+            await cdsp.update()
+            samples.append(time.perf_counter() - started)
+        return {**summarize(samples), "requests": dict(fake.requests),
+                "requests_per_cycle": round(sum(fake.requests.values()) / cycles, 2)}
+    finally:
+        await cdsp.async_close()
+        await fake.stop()
+
+
+async def bench_commands(hass: HomeAssistant, options: FakeOptions, transport: str, burst: int) -> dict:
+    """Throughput of a burst of volume writes through async_set_volume."""
+    fake = FakeCamillaDSP(options, seed=2)
+    await fake.start()
+    cdsp = CDSPClient(hass, client_url(fake, transport), transport)
+    try:
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(cdsp.async_set_volume(-40 + index * 0.1) for index in range(burst)),
+            return_exceptions=True,
+        )
+        elapsed = time.perf_counter() - started
+        written = fake.requests["setparam/volume"] + fake.requests["ws/SetVolume"]
+        return {
+            "submitted": burst,
+            "written": written,
+            "dropped": cdsp.commands.dropped,
+            "elapsed_ms": round(elapsed * 1000, 3),
+            "commands_per_s": round(burst / elapsed, 1),
+            "final_volume_matches": fake.state.volume == -40 + (burst - 1) * 0.1,
+        }
+    finally:
+        await cdsp.async_close()
+        await fake.stop()
+
+
+async def bench_switch(hass: HomeAssistant, options: FakeOptions, transport: str, switches: int) -> dict:
+    """Time of async_select_source, before and after the config cache is filled."""
+    fake = FakeCamillaDSP(options, seed=3)
+    await fake.start()
+    cdsp = CDSPClient(hass, client_url(fake, transport), transport)
+    names = list(fake.state.configs)
+    try:
+        cold = []
+        for index in range(switches):
+            cdsp.configs = CDSPConfigCache(hass, cdsp.async_get_api)
+            await cdsp.async_select_source(names[index % len(names)])
+            cold.append(cdsp.last_switch_duration or 0)
+
+        # Fill the cache through the regular slow poll tier and its prefetch.
+        await cdsp.update()
+        await asyncio.sleep(options.latency * 4 + 0.1)
+        warm = []
+        for index in range(switches):
+            await cdsp.async_select_source(names[index % len(names)])
+            warm.append(cdsp.last_switch_duration or 0)
+
+        return {"cold": summarize(cold), "warm": summarize(warm), "requests": dict(fake.requests)}
+    finally:
+        await cdsp.async_close()
+        await fake.stop()
+
+
+async def bench_instances(hass: HomeAssistant, options: FakeOptions, transport: str,
+                          instances: int, duration: float, interval: float) -> dict:
+    """Poll load and event loop lag with many coordinators on the shared scheduler."""
+    fakes = [FakeCamillaDSP(options, seed=index) for index in range(instances)]
+    await asyncio.gather(*(fake.start() for fake in fakes))
+    scheduler = CDSPPollScheduler(hass)
+    coordinators = []
+    unregister = []
+    for fake in fakes:
+        cdsp = CDSPClient(hass, client_url(fake, transport), transport)
+        coordinator = CDSPDataUpdateCoordinator(
+            hass, cdsp, timedelta(seconds=interval),
+            fast_interval=interval, slow_interval=interval, max_backoff=interval,
+        )
+        coordinators.append(coordinator)
+        unregister.append(scheduler.async_register(coordinator))
+
+    lags: list[float] = []
+    probe = 0.01
+    deadline = time.perf_counter() + duration
+    try:
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            await asyncio.sleep(probe)
+            lags.append(max(0.0, time.perf_counter() - started - probe))
+    finally:
+        for callback in unregister:
+            callback()
+        scheduler.async_shutdown()
+        for coordinator in coordinators:
+            await coordinator.async_shutdown()
+            await coordinator.cdsp.async_close()
+        await asyncio.gather(*(fake.stop() for fake in fakes))
+
+    requests = sum(sum(fake.requests.values()) for fake in fakes)
+    return {
+        "instances": instances,
+        "duration_s": duration,
+        "interval_s": interval,
+        "requests": requests,
+        "requests_per_s": round(requests / duration, 2),
+        "loop_lag": summarize(lags),
+    }
+
+
+async def bench_discovery(hass: HomeAssistant, options: FakeOptions, instances: int, closed: int) -> dict:
+    """Duration of a discovery scan over running fakes and closed ports."""
+    fakes = [FakeCamillaDSP(options, seed=index) for index in range(instances)]
+    await asyncio.gather(*(fake.start() for fake in fakes))
+    try:
+        ports = [int(fake.url.rsplit(":", 1)[1]) for fake in fakes]
+        # Ports right above the highest fake port are very likely closed.
+        unused = [max(ports) + 1 + index for index in range(closed)]
+        urls = parse_hosts(", ".join(f"127.0.0.1:{port}" for port in ports + unused))
+        started = time.perf_counter()
+        found = await async_discover(hass, urls)
+        elapsed = time.perf_counter() - started
+    finally:
+        await asyncio.gather(*(fake.stop() for fake in fakes))
+    return {
+        "probed": len(urls),
+        "found": len(found),
+        "expected": instances,
+        "duration_ms": round(elapsed * 1000, 3),
+    }
+
+
+async def run(args: argparse.Namespace) -> dict:
+    options = FakeOptions(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                          config_size=args.config_size)
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        try:
+            results = {
+                "update": await bench_update(hass, options, args.transport, args.cycles),
+                "commands": await bench_commands(hass, options, args.transport, args.burst),
+                "switch": await bench_switch(hass, options, args.transport, args.switches),
+                "instances": await bench_instances(hass, options, args.transport, args.instances,
+                                                   args.duration, args.interval),
+                "discovery": await bench_discovery(hass, options, args.instances, args.closed_ports),
+            }
+        finally:
+            await hass.async_stop(force=True)
+
+    return {
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "transport": args.transport,
+        "options": vars(options),
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transport", choices=["http", "websocket"], default="http")
+    parser.add_argument("--latency", type=float, default=0.005, help="seconds per request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="seconds, +/- around latency")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--config-size", type=int, default=4096, help="bytes per config")
+    parser.add_argument("--cycles", type=int, default=50)
+    parser.add_argument("--burst", type=int, default=100)
+    parser.add_argument("--switches", type=int, default=10)
+    parser.add_argument("--instances", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--interval", type=float, default=2)
+    parser.add_argument("--closed-ports", type=int, default=200, help="ports without fake probed by the discovery")
+    parser.add_argument("--output", help="write results to this file instead of stdout")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
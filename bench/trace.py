@@ -0,0 +1,85 @@
+"""Compact file format for recorded camillagui HTTP exchanges.
+
+A trace is a gzip compressed JSON lines file. Response and request bodies
+are stored once and referenced by index, since most polls return the same
+documents again:
+
+    {"body": 0, "text": "..."}
+    {"t": 0.512, "method": "GET", "endpoint": "status", "status": 200,
+     "request": null, "response": 0, "latency": 0.0042}
+
+"t" is the start of the exchange in seconds since the recording started,
+"latency" the time until the response body was read.
+"""
+from __future__ import annotations
+
+from collections.abc import Iterator
+from dataclasses import dataclass
+import gzip
+import json
+from typing import IO
+
+
+@dataclass(frozen=True, slots=True)
+class Exchange:
+    t: float
+    method: str
+    endpoint: str
+    status: int
+    request: str | None
+    response: str
+    latency: float
+
+
+class TraceWriter:
+    """Append exchanges to a trace file."""
+
+    def __init__(self, path: str) -> None:
+        self._file: IO[str] = gzip.open(path, "wt", encoding="utf-8")
+        self._bodies: dict[str, int] = {}
+        self.exchanges = 0
+
+    def _body(self, text: str | None) -> int | None:
+        if text is None:
+            return None
+        if (index := self._bodies.get(text)) is None:
+            index = self._bodies[text] = len(self._bodies)
+            self._file.write(json.dumps({"body": index, "text": text}) + "\n")
+        return index
+
+    def write(self, exchange: Exchange) -> None:
+        request = self._body(exchange.request)
+        response = self._body(exchange.response)
+        self._file.write(json.dumps({
+            "t": round(exchange.t, 6),
+            "method": exchange.method,
+            "endpoint": exchange.endpoint,
+            "status": exchange.status,
+            "request": request,
+            "response": response,
+            "latency": round(exchange.latency, 6),
+        }) + "\n")
+        self.exchanges += 1
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def read_trace(path: str) -> Iterator[Exchange]:
+    """Yield the exchanges of a trace file in recorded order."""
+    bodies: dict[int, str] = {}
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        for line in file:
+            record = json.loads(line)
+            if "body" in record:
+                bodies[record["body"]] = record["text"]
+                continue
+            yield Exchange(
+                t=record["t"],
+                method=record["method"],
+                endpoint=record["endpoint"],
+                status=record["status"],
+                request=bodies.get(record["request"]) if record["request"] is not None else None,
+                response=bodies[record["response"]],
+                latency=record["latency"],
+            )
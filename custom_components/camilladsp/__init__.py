@@ -7,41 +7,113 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.typing import ConfigType
 
 from .cdsp import CDSPClient
-from .const import CONFIG_URL, DOMAIN
-from .coordinator import ApiError, CDSPDataUpdateCoordinator
-
-SCAN_INTERVAL = timedelta(seconds=10)
+from .const import (
+    CONFIG_GROUP_MEMBERS,
+    CONFIG_GROUP_OFFSETS,
+    CONFIG_LEVEL_SAMPLE_RATE,
+    CONFIG_LEVEL_WINDOW,
+    CONFIG_POLL_FAST,
+    CONFIG_POLL_MAX_BACKOFF,
+    CONFIG_POLL_NORMAL,
+    CONFIG_POLL_SLOW,
+    CONFIG_TRANSPORT,
+    CONFIG_URL,
+    DATA_GROUPS,
+    DATA_SCHEDULER,
+    DEFAULT_LEVEL_SAMPLE_RATE,
+    DEFAULT_LEVEL_WINDOW,
+    DEFAULT_POLL_FAST,
+    DEFAULT_POLL_MAX_BACKOFF,
+    DEFAULT_POLL_NORMAL,
+    DEFAULT_POLL_SLOW,
+    DOMAIN,
+    EVENT_DEBOUNCE,
+    TRANSPORT_HTTP,
+)
+from .coordinator import CDSPDataUpdateCoordinator
+from .events import CDSPEventDispatcher
+from .group import CDSPGroupCoordinator
+from .levels import LevelSampler
+from .scheduler import CDSPPollScheduler
+from .services import async_setup_services
+from .store import CDSPStateStore
+from .websocket_api import async_setup_websocket_api
+
+SCAN_INTERVAL = timedelta(seconds=DEFAULT_POLL_NORMAL)
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
 
 LOGGER = logging.getLogger(__name__)
 
 
 # List of platforms to support. There should be a matching .py file for each,
 # eg <cover.py> and <sensor.py>
-PLATFORMS = [Platform.MEDIA_PLAYER]
+PLATFORMS = [Platform.MEDIA_PLAYER, Platform.NUMBER, Platform.SENSOR, Platform.SWITCH]
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the services and websocket commands shared by all CamillaDSP instances."""
+    async_setup_services(hass)
+    async_setup_websocket_api(hass)
+    return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
+    if CONFIG_GROUP_MEMBERS in entry.data:
+        return await _async_setup_group_entry(hass, entry)
+
     hass.data.setdefault(DOMAIN, {})
 
     url = entry.data[CONFIG_URL]
+    transport = entry.data.get(CONFIG_TRANSPORT, TRANSPORT_HTTP)
 
     # Initialize connection to camilladsp
-    cdsp = CDSPClient(hass, url)
-    try:
-        await cdsp.update()
-    except ApiError as ex:
-        raise ConfigEntryNotReady("Error while communicating to CamillaDSP") from ex
+    cdsp = CDSPClient(hass, url, transport)
 
     LOGGER.debug(f"CamillaDSP entry: {entry}")
 
-    coordinator = CDSPDataUpdateCoordinator(hass, cdsp, SCAN_INTERVAL)  # type: ignore[arg-type]
-    await coordinator.async_config_entry_first_refresh()
+    coordinator = CDSPDataUpdateCoordinator(
+        hass,
+        cdsp,
+        timedelta(seconds=entry.options.get(CONFIG_POLL_NORMAL, SCAN_INTERVAL.total_seconds())),
+        fast_interval=entry.options.get(CONFIG_POLL_FAST, DEFAULT_POLL_FAST),
+        slow_interval=entry.options.get(CONFIG_POLL_SLOW, DEFAULT_POLL_SLOW),
+        max_backoff=entry.options.get(CONFIG_POLL_MAX_BACKOFF, DEFAULT_POLL_MAX_BACKOFF),
+    )
+    coordinator.levels = LevelSampler(
+        hass,
+        cdsp,
+        entry.options.get(CONFIG_LEVEL_SAMPLE_RATE, DEFAULT_LEVEL_SAMPLE_RATE),
+        entry.options.get(CONFIG_LEVEL_WINDOW, DEFAULT_LEVEL_WINDOW),
+    )
+    coordinator.store = CDSPStateStore(hass, entry.entry_id)
+    coordinator.events = CDSPEventDispatcher(hass, entry.entry_id, EVENT_DEBOUNCE)
+
+    # With a last known state the entities are set up right away and the
+    # first poll runs in the background, otherwise setup waits for it.
+    if (stored := await coordinator.store.async_load()) is not None:
+        coordinator.data = stored
+    else:
+        try:
+            await coordinator.async_config_entry_first_refresh()
+        except ConfigEntryNotReady:
+            await cdsp.async_close()
+            raise
 
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
 
+    if DATA_SCHEDULER not in hass.data:
+        hass.data[DATA_SCHEDULER] = CDSPPollScheduler(hass)
+    scheduler = hass.data[DATA_SCHEDULER]
+    entry.async_on_unload(scheduler.async_register(coordinator))
+    if stored is not None:
+        scheduler.async_reschedule(coordinator, 0)
+
     entry.async_on_unload(entry.add_update_listener(_update_listener))
 
     # This creates each HA object for each platform your device requires.
@@ -50,16 +122,44 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     return True
 
 
+async def _async_setup_group_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Set up a volume group, it only has a media player."""
+    coordinator = CDSPGroupCoordinator(
+        hass,
+        entry.title,
+        entry.data[CONFIG_GROUP_MEMBERS],
+        entry.options.get(CONFIG_GROUP_OFFSETS, {}),
+    )
+    await coordinator.async_config_entry_first_refresh()
+    hass.data.setdefault(DATA_GROUPS, {})[entry.entry_id] = coordinator
+
+    entry.async_on_unload(entry.add_update_listener(_update_listener))
+    await hass.config_entries.async_forward_entry_setups(entry, [Platform.MEDIA_PLAYER])
+    return True
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
+    if CONFIG_GROUP_MEMBERS in entry.data:
+        if unload_ok := await hass.config_entries.async_unload_platforms(entry, [Platform.MEDIA_PLAYER]):
+            await hass.data[DATA_GROUPS].pop(entry.entry_id).async_shutdown()
+        return unload_ok
+
     # This is called when an entry/configured device is to be removed. The class
     # needs to unload itself, and remove callbacks. See the classes for further
     # details
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        await coordinator.async_shutdown()
+        await coordinator.cdsp.async_close()
 
     return unload_ok
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the stored state of a deleted entry."""
+    await CDSPStateStore(hass, entry.entry_id).async_remove()
+
+
 async def _update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Handle options update."""
     await hass.config_entries.async_reload(entry.entry_id)
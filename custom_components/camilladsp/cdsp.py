@@ -1,55 +1,374 @@
 __version__ = "1.0.1"
 
+import asyncio
+import dataclasses
 import hashlib
 import json
 import logging
+import posixpath
+import time
+from collections import deque
+from functools import partial
+from http import HTTPStatus
 from typing import Any
 
+import aiohttp
+
 from homeassistant.components.media_player import MediaPlayerState
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
-from .const import DOMAIN
-from .model import CDSPData
+from .commands import CDSPCommandQueue
+from .configs import CDSPConfigCache, ConfigParameter, build_config_patch, config_parameters
+from .const import (
+    CONFIG_LIST_REFRESH_INTERVAL,
+    BREAKER_THRESHOLD,
+    CAPTURERATE_TOLERANCE,
+    DOMAIN,
+    NOMINAL_SAMPLE_RATES,
+    REQUEST_TIMEOUT,
+    STATUS_THRESHOLDS,
+    TRANSPORT_HTTP,
+    TRANSPORT_WEBSOCKET,
+    UPDATE_TIMEOUT,
+)
+from .health import CDSPHealthStats
+from .metrics import CDSPMetrics
+from .model import CDSPData, CDSPFader, CDSPStatus
 
 LOGGER = logging.getLogger(__name__)
 
 
+class ApiError(Exception):
+    """Error to indicate something wrong with the API."""
+
+
+class UnsupportedError(ApiError):
+    """Error to indicate the backend doesn't know an endpoint or command."""
+
+
+def make_cdsp_id(url: str) -> str:
+    """Id of the CamillaDSP instance at url, used as config entry unique id."""
+    md5 = hashlib.md5()
+    md5.update(url.encode('utf-8'))
+    return md5.hexdigest()[0:16]
+
+
 class CDSPClient:
     """Set up CamillaDSP."""
 
-    def __init__(self, hass: HomeAssistant, url: str) -> None:
+    def __init__(self, hass: HomeAssistant, url: str, transport: str = TRANSPORT_HTTP) -> None:
         """Initialize CamillaDSP module."""
         self.hass = hass
         self.url = url
+        self.transport = transport
         self.status: dict = {}
 
-        md5 = hashlib.md5()
-        md5.update(url.encode('utf-8'))
-        self.cdsp_id = md5.hexdigest()[0:16]
+        self.cdsp_id = make_cdsp_id(url)
         self.name = DOMAIN
 
-        self._volume: float = 0
-        self._mute: bool = False
         self._source: str = ""
+        self._source_list: tuple[str, ...] = ()
+        self._status = CDSPStatus()
+        self._capturerate: int = 0
+
+        # Slow tier: config name and stored configs change rarely, so they are
+        # only fetched every CONFIG_LIST_REFRESH_INTERVAL seconds and only
+        # re-parsed when their content hash changes.
+        self._configs_updated: float | None = None
+        self._active_config_hash: str = ""
+        # Parsed copy of the running config, with the patches sent since it
+        # was read. None until read, and again after a source switch.
+        self._active_config: dict[str, Any] | None = None
+        self._patch_lock = asyncio.Lock()
+        self._stored_configs_hash: str = ""
+
+        # Every command gets a generation number. Poll results for a field
+        # are only trusted once the latest command on that field had been
+        # acknowledged before the poll started, otherwise the optimistic
+        # value of the command is kept.
+        self.generation: int = 0
+        self._optimistic: dict[str, tuple[int, Any]] = {}
+        self._acked: dict[str, int] = {}
+        self._unconfirmed: set[str] = set()
+
+        self.metrics = CDSPMetrics()
+        self.health = CDSPHealthStats()
+        # Consecutive failed update cycles, the circuit breaker opens at BREAKER_THRESHOLD
+        self._failures: int = 0
+        self.commands = CDSPCommandQueue(hass)
+        self.configs = CDSPConfigCache(hass, self.async_get_api)
+        self.last_switch_duration: float | None = None
+        # None until known whether the backend returns all faders in one request
+        self._faders_supported: bool | None = None
+
+        if transport == TRANSPORT_WEBSOCKET:
+            self._api: CDSPHttpTransport | CDSPWebsocketTransport = CDSPWebsocketTransport(hass, url)
+        else:
+            self._api = CDSPHttpTransport(hass, url)
+
+    @property
+    def volume_ramp_time(self) -> float | None:
+        """Volume ramp time of the active config in seconds, if it is known."""
+        cached = self.configs.get(self._source)
+        if cached is None or not isinstance(cached.config, dict):
+            return None
+        ramp = (cached.config.get("devices") or {}).get("volume_ramp_time")
+        return ramp / 1000 if ramp else None
 
     async def async_set_volume(self, volume: float):
-        await self.async_post_api(endpoint="setparam/volume", data=str(volume))
-        self._volume = volume
+        generation = self._begin_command("volume", volume)
+        await self.commands.async_submit(
+            "volume", (generation, volume),
+            partial(self._async_write_param, "volume", "setparam/volume")
+        )
 
     async def async_set_muted(self, muted: bool):
-        await self.async_post_api(endpoint="setparam/mute", data=str(muted))
-        self._mute = muted
+        generation = self._begin_command("mute", muted)
+        await self.commands.async_submit(
+            "mute", (generation, muted),
+            partial(self._async_write_param, "mute", "setparam/mute")
+        )
+
+    async def async_set_fader_volume(self, index: int, volume: float):
+        if index == 0:
+            await self.async_set_volume(volume)
+            return
+        field = f"volume_{index}"
+        generation = self._begin_command(field, volume)
+        await self.commands.async_submit(
+            field, (generation, volume),
+            partial(self._async_write_param, field, f"setparamindex/volume/{index}")
+        )
+
+    async def async_set_fader_muted(self, index: int, muted: bool):
+        if index == 0:
+            await self.async_set_muted(muted)
+            return
+        field = f"mute_{index}"
+        generation = self._begin_command(field, muted)
+        await self.commands.async_submit(
+            field, (generation, muted),
+            partial(self._async_write_param, field, f"setparamindex/mute/{index}")
+        )
+
+    async def _async_write_param(self, field: str, endpoint: str, command: tuple[int, Any]):
+        generation, value = command
+        try:
+            await self.async_post_api(endpoint=endpoint, data=str(value))
+        except Exception:
+            self._discard_command(field, generation)
+            raise
+        self._ack_command(field, generation)
+
+    def config_value(self, path: tuple[str | int, ...]) -> Any:
+        """Value at path in the cached running config, None if unknown."""
+        value: Any = self._active_config
+        for key in path:
+            try:
+                value = value[key]
+            except (KeyError, IndexError, TypeError):
+                return None
+        return value
+
+    def config_parameters(self) -> list[ConfigParameter]:
+        """Patchable values of the cached running config."""
+        return config_parameters(self._active_config)
+
+    async def async_set_config_value(self, path: tuple[str | int, ...], value: Any):
+        """Change one value of the running config, without a full config round trip.
+
+        Writes to the same path are coalesced like parameter writes.
+        """
+        await self.commands.async_submit(
+            "config/" + "/".join(map(str, path)), value,
+            partial(self._async_write_config_value, path)
+        )
+
+    async def _async_write_config_value(self, path: tuple[str | int, ...], value: Any):
+        async with self._patch_lock:
+            config = await self._async_get_active_config()
+            patched, patch = build_config_patch(config, path, value)
+            if patched == config:
+                return
+            if self.transport == TRANSPORT_WEBSOCKET:
+                await self.async_post_api(endpoint="patchconfig", data=json.dumps(patch))
+            else:
+                # camillagui has no patch endpoint, the patched copy of the
+                # cached config is sent, nothing is downloaded.
+                await self.async_post_api(endpoint="setconfig", data=json.dumps(
+                    {"configFileName": self._source, "config": patched}
+                ))
+            self._active_config = patched
+
+    async def _async_get_active_config(self) -> dict[str, Any]:
+        if self._active_config is None:
+            activeConfig = json.loads(await self.async_get_api(endpoint="getactiveconfigfile"))
+            if not isinstance(activeConfig.get("config"), dict):
+                raise ApiError("CamillaDSP has no active config")
+            self._active_config = activeConfig["config"]
+        return self._active_config
 
     async def async_select_source(self, source: str):
-        data = f"{{\"name\":\"{source!s}\"}}"
+        generation = self._begin_command("source", source)
+        started = time.monotonic()
+        # Patches of the previous config are gone after the switch.
+        self._active_config = None
+        self._active_config_hash = ""
+        try:
+            if await self._async_switch_config(source):
+                self._source = source
+                self._ack_command("source", generation)
+            else:
+                LOGGER.warning("Error setting active config file")
+                self._discard_command("source", generation)
+        except Exception:
+            self._discard_command("source", generation)
+            raise
+        finally:
+            # Read the active config with the next poll, not after the slow
+            # refresh interval, also after a failed or partial switch.
+            self._configs_updated = None
+            self.last_switch_duration = time.monotonic() - started
+            LOGGER.debug(f"CamillaDSP switch to {source} took {self.last_switch_duration:.3f} s")
+
+    async def _async_switch_config(self, source: str) -> bool:
+        data = json.dumps({"name": source})
+
+        if self.transport == TRANSPORT_WEBSOCKET:
+            # Setting the config file path and reloading applies it completely.
+            await self.async_post_api(endpoint="setactiveconfigfile", data=data)
+            return True
+
+        if (cached := self.configs.get(source)) is not None:
+            # The config document is already known, so both requests can go
+            # out at once and nothing has to be downloaded.
+            endpoints = ("setactiveconfigfile", "setconfig")
+            results = await asyncio.gather(
+                self.async_post_api(endpoint="setactiveconfigfile", data=data),
+                self.async_post_api(endpoint="setconfig", data=cached.document),
+                return_exceptions=True,
+            )
+            failed = {endpoint: result for endpoint, result in zip(endpoints, results) if isinstance(result, Exception)}
+            if failed:
+                # Tell which half landed, the DSP may run the new config under the old name.
+                landed = [endpoint for endpoint in endpoints if endpoint not in failed]
+                error = next(iter(failed.values()))
+                raise ApiError(f"Switch to {source} failed in {', '.join(failed)}, "
+                               f"succeeded: {', '.join(landed) or 'none'}: {error}") from error
+            return True
+
         await self.async_post_api(endpoint="setactiveconfigfile", data=data)
         configData = await self.async_get_api(endpoint="getactiveconfigfile")
-        if json.loads(configData)["configFileName"] == source:
-            await self.async_post_api(endpoint="setconfig", data=configData)
-            self._source = source
-        else:
-            LOGGER.warning("Error setting active config file")
+        activeConfig = json.loads(configData)
+        if activeConfig["configFileName"] != source:
+            return False
+        await self.async_post_api(endpoint="setconfig", data=configData)
+        self.configs.add(source, activeConfig.get("config"))
+        return True
+
+    def _begin_command(self, field: str, value: Any) -> int:
+        self.generation += 1
+        self._optimistic[field] = (self.generation, value)
+        return self.generation
+
+    def _ack_command(self, field: str, generation: int) -> None:
+        self._acked[field] = max(self._acked.get(field, 0), generation)
+        self._unconfirmed.add(field)
+
+    def _discard_command(self, field: str, generation: int) -> None:
+        if self._optimistic.get(field, (0, None))[0] == generation:
+            self._optimistic.pop(field)
+        self._unconfirmed.add(field)
+
+    def _reconcile(self, polled: dict[str, Any], acked: dict[str, int]) -> dict[str, Any]:
+        """Merge polled field values with the optimistic values of pending commands.
+
+        acked is the snapshot of acknowledged generations taken when the poll
+        started.
+        """
+        for field in polled:
+            if field not in self._optimistic:
+                continue
+            generation, value = self._optimistic[field]
+            if acked.get(field, 0) >= generation:
+                self._optimistic.pop(field)
+            else:
+                polled[field] = value
+        return polled
+
+    async def async_confirm(self) -> dict[str, Any]:
+        """Read back only the fields changed by recent commands."""
+        readers = {
+            "volume": self._async_read_volume,
+            "mute": self._async_read_mute,
+            "source": self._async_read_source,
+        }
+        fields = [field for field in self._unconfirmed if field in readers]
+        aux = any(field not in readers for field in self._unconfirmed)
+        self._unconfirmed.clear()
+        if not fields and not aux:
+            return {}
+
+        acked = dict(self._acked)
+        requests = [readers[field]() for field in fields]
+        if aux:
+            requests.append(self._async_read_faders())
+        values = await asyncio.gather(*requests)
+        polled = dict(zip(fields, values))
+        if aux:
+            polled.update({field: value for field, value in values[-1].items() if "_" in field})
+        return self._reconcile(polled, acked)
+
+    async def async_get_signal_levels(self) -> dict[str, list[float]]:
+        """Get the current playback and capture signal levels in dB per channel."""
+        if self.transport == TRANSPORT_WEBSOCKET:
+            return json.loads(await self.async_get_api(endpoint="signallevels"))
+
+        statusData = json.loads(await self.async_get_api(endpoint="status"))
+        return {
+            "playback_rms": statusData.get("playbacksignalrms") or [],
+            "playback_peak": statusData.get("playbacksignalpeak") or [],
+            "capture_rms": statusData.get("capturesignalrms") or [],
+            "capture_peak": statusData.get("capturesignalpeak") or [],
+        }
+
+    async def _async_read_volume(self) -> float:
+        return float(await self.async_get_api(endpoint="getparam/volume"))
+
+    async def _async_read_mute(self) -> bool:
+        return (await self.async_get_api(endpoint="getparam/mute")) == "True"
+
+    async def _async_read_faders(self) -> dict[str, Any]:
+        """Read all faders as fields, in one request if the backend supports it.
+
+        The main fader is returned as volume and mute, aux fader n as
+        volume_n and mute_n.
+        """
+        if self._faders_supported is not False:
+            try:
+                faders = json.loads(await self.async_get_api(endpoint="getlistparam/faders"))
+            except UnsupportedError as err:
+                # Other errors, eg. while CamillaDSP is starting, don't tell
+                # anything about the support, the next poll tries again.
+                if self._faders_supported:
+                    raise
+                LOGGER.debug(f"CamillaDSP faders not available, reading main volume and mute: {err}")
+                self._faders_supported = False
+            else:
+                self._faders_supported = True
+                fields: dict[str, Any] = {}
+                for index, fader in enumerate(faders):
+                    suffix = f"_{index}" if index else ""
+                    fields[f"volume{suffix}"] = float(fader["volume"])
+                    fields[f"mute{suffix}"] = bool(fader["mute"])
+                return fields
+
+        volume, mute = await asyncio.gather(self._async_read_volume(), self._async_read_mute())
+        return {"volume": volume, "mute": mute}
+
+    async def _async_read_source(self) -> str:
+        return json.loads(await self.async_get_api(endpoint="getactiveconfigfile"))["configFileName"]
 
     async def connect(self) -> None:
         """Connect to CamillaDSP API."""
@@ -62,70 +381,434 @@ class CDSPClient:
 
         LOGGER.debug("CamillaDSP connected!")
 
+    async def async_probe(self) -> dict[str, Any]:
+        """Check that CamillaDSP answers with a single status request."""
+        try:
+            async with asyncio.timeout(REQUEST_TIMEOUT):
+                statusData = json.loads(await self.async_get_api(endpoint="status", probe=True))
+        except (TimeoutError, ValueError) as err:
+            raise ApiError(f"CamillaDSP status probe failed: {err!r}") from err
+        if not isinstance(statusData, dict) or "cdsp_status" not in statusData:
+            raise ApiError("CamillaDSP status probe returned no status")
+        return statusData
+
+    async def async_close(self) -> None:
+        """Close the connection to CamillaDSP."""
+        self.commands.async_shutdown()
+        self.configs.async_shutdown()
+        await self._api.async_close()
+
+
+    @property
+    def breaker_open(self) -> bool:
+        """Return True while CamillaDSP is considered unreachable."""
+        return self._failures >= BREAKER_THRESHOLD
 
     async def update(self) -> CDSPData:
-        """Update CamillaDSP data through API."""
+        """Update CamillaDSP data through API.
+
+        Raises ApiError if CamillaDSP can't be reached or the cycle exceeds
+        UPDATE_TIMEOUT. While the circuit breaker is open, only the status
+        request is sent, as probe, until it succeeds again.
+        """
+        try:
+            async with asyncio.timeout(UPDATE_TIMEOUT):
+                data = await self._async_update()
+        except ApiError:
+            self._record_failure()
+            raise
+        except (TimeoutError, ValueError, KeyError, TypeError) as err:
+            self._record_failure()
+            raise ApiError(f"CamillaDSP update failed: {err!r}") from err
+
+        self._failures = 0
+        return data
+
+    def _record_failure(self) -> None:
+        self._configs_updated = None
+        self._failures += 1
+        if self._failures == BREAKER_THRESHOLD:
+            LOGGER.warning(f"CamillaDSP at {self.url} is unreachable, only probing its status")
+
+    async def _async_update(self) -> CDSPData:
         state: MediaPlayerState = MediaPlayerState.OFF
         volume: float = 0
         mute: bool = False
         source: str = ""
-        source_list: list[str] = []
+        source_list: tuple[str, ...] = ()
         capturerate: int = 0
+        faders: tuple[CDSPFader, ...] = ()
+        status = CDSPStatus()
 
-        try:
-            statusData = json.loads(await self.async_get_api(endpoint="status"))
-            match statusData["cdsp_status"]:
-                case 'INACTIVE':
-                    state = MediaPlayerState.STANDBY
-                case 'PAUSED':
-                    state = MediaPlayerState.PAUSED
-                case 'RUNNING':
-                    state = MediaPlayerState.PLAYING
-                case 'STALLED':
-                    state = MediaPlayerState.IDLE
-                case 'STARTING':
-                    state = MediaPlayerState.ON
-
-            if state != MediaPlayerState.OFF:
-                if statusData.get("capturerate") is not None:
-                    capturerate = statusData["capturerate"]
-                else:
-                    capturerate = 0
+        acked = dict(self._acked)
 
-                volume = float(await self.async_get_api(endpoint="getparam/volume"))
-                mute = (await self.async_get_api(endpoint="getparam/mute")) == "True"
-                source = (json.loads(await self.async_get_api(endpoint="getactiveconfigfile"))["configFileName"])
+        statusData = json.loads(await self.async_get_api(endpoint="status", probe=True))
+        if self.breaker_open:
+            # The probe succeeded, allow the remaining requests of this cycle.
+            LOGGER.info(f"CamillaDSP at {self.url} is reachable again")
+            self._failures = 0
+        match statusData["cdsp_status"]:
+            case 'INACTIVE':
+                state = MediaPlayerState.STANDBY
+            case 'PAUSED':
+                state = MediaPlayerState.PAUSED
+            case 'RUNNING':
+                state = MediaPlayerState.PLAYING
+            case 'STALLED':
+                state = MediaPlayerState.IDLE
+            case 'STARTING':
+                state = MediaPlayerState.ON
 
-                storedconfigs = json.loads(await self.async_get_api(endpoint="storedconfigs"))
-                source_list = []
-                for config in storedconfigs:
-                    if config.get("name") is not None:
-                        source_list.append(config.get("name"))
+        if state != MediaPlayerState.OFF:
+            capturerate = self._nominal_capturerate(statusData.get("capturerate"))
+            status = self._filter_status(statusData)
+            self.health.record(statusData, capturerate)
 
-        except Exception as e:
-            log = f"CamillaDSP error: api call failed: {e}"
-            LOGGER.debug(log)
+            requests = [self._async_read_faders()]
+            refresh_configs = self._configs_refresh_due()
+            if refresh_configs:
+                requests.append(self.async_get_api(endpoint="getactiveconfigfile"))
+                requests.append(self.async_get_api(endpoint="storedconfigs"))
 
-        #await self._websession.close()
+            results = await asyncio.gather(*requests)
+            if refresh_configs:
+                self._update_configs(results[1], results[2])
+
+            polled = self._reconcile({**results[0], "source": self._source}, acked)
+            volume = polled["volume"]
+            mute = polled["mute"]
+            source = polled["source"]
+            source_list = self._source_list
+            if self._faders_supported:
+                faders = tuple(
+                    CDSPFader(volume=polled[f"volume_{index}"], mute=polled[f"mute_{index}"])
+                    if index else CDSPFader(volume=volume, mute=mute)
+                    for index in range(len(results[0]) // 2)
+                )
+        else:
+            self._configs_updated = None
 
         return CDSPData(state=state,
                         volume=volume,
                         mute=mute,
                         source=source,
                         source_list=source_list,
-                        capturerate=capturerate)
+                        capturerate=capturerate,
+                        faders=faders,
+                        status=status,
+                        config_revision=self._active_config_hash)
 
-    async def async_get_api(self, endpoint: str) -> Any:
-        url = f"{self.url}/api/{endpoint}"
+    def _filter_status(self, statusData: dict[str, Any]) -> CDSPStatus:
+        """Take status values that moved by at least their threshold."""
+        polled = {
+            "processing_load": statusData.get("processingload"),
+            "rate_adjust": statusData.get("rateadjust"),
+            "buffer_level": statusData.get("bufferlevel"),
+            "clipped_samples": statusData.get("clippedsamples"),
+        }
+        changes = {}
+        for field, value in polled.items():
+            current = getattr(self._status, field)
+            if value is None or current is None or abs(value - current) >= STATUS_THRESHOLDS[field]:
+                if value != current:
+                    changes[field] = value
+        if changes:
+            self._status = dataclasses.replace(self._status, **changes)
+        return self._status
 
-        session = async_get_clientsession(self.hass)
-        res = await session.get(url)
-        return await res.text()
+    def _nominal_capturerate(self, measured: float | None) -> int:
+        """Nominal sample rate for the measured capture rate, which drifts by a few Hz.
 
+        A rate that isn't close to a nominal one is only followed when it
+        moved by more than the tolerance.
+        """
+        if not measured:
+            self._capturerate = 0
+            return 0
+        nominal = min(NOMINAL_SAMPLE_RATES, key=lambda rate: abs(rate - measured))
+        if abs(nominal - measured) <= nominal * CAPTURERATE_TOLERANCE:
+            self._capturerate = nominal
+        elif abs(measured - self._capturerate) > self._capturerate * CAPTURERATE_TOLERANCE:
+            self._capturerate = int(measured)
+        return self._capturerate
+
+    def _configs_refresh_due(self) -> bool:
+        if self._configs_updated is None:
+            return True
+        return time.monotonic() - self._configs_updated >= CONFIG_LIST_REFRESH_INTERVAL
+
+    def _update_configs(self, activeConfigData: str, storedConfigsData: str) -> None:
+        """Parse active config name and stored configs if their content changed."""
+        activeHash = hashlib.md5(activeConfigData.encode('utf-8')).hexdigest()
+        if activeHash != self._active_config_hash:
+            activeConfig = json.loads(activeConfigData)
+            self._source = activeConfig["configFileName"]
+            if self._source and activeConfig.get("config") is not None:
+                self.configs.add(self._source, activeConfig["config"])
+            if isinstance(activeConfig.get("config"), dict):
+                self._active_config = activeConfig["config"]
+            self._active_config_hash = activeHash
+
+        storedHash = hashlib.md5(storedConfigsData.encode('utf-8')).hexdigest()
+        if storedHash != self._stored_configs_hash:
+            storedConfigs = json.loads(storedConfigsData)
+            source_list = []
+            for config in storedConfigs:
+                if config.get("name") is not None:
+                    source_list.append(config.get("name"))
+            if tuple(source_list) != self._source_list:
+                self._source_list = tuple(source_list)
+            self._stored_configs_hash = storedHash
+            if self.transport != TRANSPORT_WEBSOCKET:
+                self.configs.async_update_index(storedConfigs)
+
+        self._configs_updated = time.monotonic()
+
+    def _check_breaker(self, probe: bool) -> None:
+        if self.breaker_open and not probe:
+            raise ApiError(f"CamillaDSP at {self.url} is unreachable")
+
+    async def async_get_api(self, endpoint: str, probe: bool = False) -> Any:
+        self._check_breaker(probe)
+        started = time.perf_counter()
+        try:
+            result = await self._api.async_get(endpoint)
+        except Exception:
+            self.metrics.record(endpoint, time.perf_counter() - started, error=True)
+            raise
+        self.metrics.record(endpoint, time.perf_counter() - started,
+                            received=len(result) if isinstance(result, str) else 0)
+        return result
 
     async def async_post_api(self, endpoint: str, data: str) -> Any:
+        self._check_breaker(False)
+        started = time.perf_counter()
+        try:
+            result = await self._api.async_post(endpoint, data)
+        except Exception:
+            self.metrics.record(endpoint, time.perf_counter() - started, sent=len(data), error=True)
+            raise
+        self.metrics.record(endpoint, time.perf_counter() - started, sent=len(data),
+                            received=len(result) if isinstance(result, str) else 0)
+        return result
+
+
+class CDSPHttpTransport:
+    """Talk to CamillaDSP through the camillagui backend."""
+
+    def __init__(self, hass: HomeAssistant, url: str) -> None:
+        self.hass = hass
+        self.url = url
+
+    async def async_get(self, endpoint: str) -> Any:
+        url = f"{self.url}/api/{endpoint}"
+
+        session = async_get_clientsession(self.hass)
+        try:
+            async with session.get(url, timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)) as res:
+                res.raise_for_status()
+                return await res.text()
+        except aiohttp.ClientResponseError as err:
+            if err.status == HTTPStatus.NOT_FOUND:
+                raise UnsupportedError(f"GET {endpoint} not supported: {err!r}") from err
+            raise ApiError(f"GET {endpoint} failed: {err!r}") from err
+        except (aiohttp.ClientError, TimeoutError) as err:
+            raise ApiError(f"GET {endpoint} failed: {err!r}") from err
+
+    async def async_post(self, endpoint: str, data: str) -> Any:
         url = f"{self.url}/api/{endpoint}"
 
         session = async_get_clientsession(self.hass)
-        res = await session.post(url, data=data, json=None)
-        return await res.text()
+        try:
+            async with session.post(url, data=data, json=None,
+                                    timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)) as res:
+                res.raise_for_status()
+                return await res.text()
+        except (aiohttp.ClientError, TimeoutError) as err:
+            raise ApiError(f"POST {endpoint} failed: {err!r}") from err
+
+    async def async_close(self) -> None:
+        """Nothing to close, the HA client session is shared."""
+
+
+class CDSPWebsocketTransport:
+    """Talk to CamillaDSP directly on its websocket control port.
+
+    One connection is kept open and reconnected on demand. CamillaDSP answers
+    requests in the order they were sent, each reply being keyed by the
+    command name, so replies are matched against a FIFO of pending requests.
+
+    The camillagui endpoints used by CDSPClient are translated to websocket
+    commands, and the replies are returned in the camillagui format.
+    """
+
+    def __init__(self, hass: HomeAssistant, url: str) -> None:
+        self.hass = hass
+        self.url = url
+
+        self._ws: aiohttp.ClientWebSocketResponse | None = None
+        self._reader: asyncio.Task | None = None
+        self._pending: deque[tuple[str, asyncio.Future]] = deque()
+        self._connect_lock = asyncio.Lock()
+        self._send_lock = asyncio.Lock()
+        self._config_path: str = ""
+
+    async def async_get(self, endpoint: str) -> Any:
+        match endpoint:
+            case "status":
+                # Sent back to back over the one connection, without waiting
+                # for the individual replies.
+                state, capturerate, load, rateadjust, bufferlevel, clipped = await asyncio.gather(
+                    self.async_request("GetState"),
+                    self.async_request("GetCaptureRate"),
+                    self.async_request("GetProcessingLoad"),
+                    self.async_request("GetRateAdjust"),
+                    self.async_request("GetBufferLevel"),
+                    self.async_request("GetClippedSamples"),
+                )
+                return json.dumps({"cdsp_status": str(state).upper(),
+                                   "capturerate": capturerate,
+                                   "processingload": load,
+                                   "rateadjust": rateadjust,
+                                   "bufferlevel": bufferlevel,
+                                   "clippedsamples": clipped})
+            case "signallevels":
+                return json.dumps(await self.async_request("GetSignalLevels"))
+            case "getparam/volume":
+                return str(await self.async_request("GetVolume"))
+            case "getparam/mute":
+                return str(await self.async_request("GetMute"))
+            case "getlistparam/faders":
+                return json.dumps(await self.async_request("GetFaders"))
+            case "getactiveconfigfile":
+                path, config = await asyncio.gather(
+                    self.async_request("GetConfigFilePath"),
+                    self.async_request("GetConfigJson"),
+                )
+                self._config_path = path or ""
+                return json.dumps({"configFileName": posixpath.basename(self._config_path),
+                                   "config": json.loads(config)})
+            case "storedconfigs":
+                # CamillaDSP itself does not know about stored configs, only
+                # the currently loaded config file can be offered.
+                path = await self.async_request("GetConfigFilePath")
+                self._config_path = path or ""
+                if not self._config_path:
+                    return "[]"
+                return json.dumps([{"name": posixpath.basename(self._config_path)}])
+        raise UnsupportedError(f"Endpoint not supported by websocket transport: {endpoint}")
+
+    async def async_post(self, endpoint: str, data: str) -> Any:
+        match endpoint:
+            case "setparam/volume":
+                return await self.async_request("SetVolume", float(data))
+            case "setparam/mute":
+                return await self.async_request("SetMute", data == "True")
+            case _ if endpoint.startswith("setparamindex/"):
+                _, name, index = endpoint.split("/")
+                if name == "volume":
+                    return await self.async_request("SetFaderVolume", [int(index), float(data)])
+                if name == "mute":
+                    return await self.async_request("SetFaderMute", [int(index), data == "True"])
+            case "setactiveconfigfile":
+                name = json.loads(data)["name"]
+                path = posixpath.join(posixpath.dirname(self._config_path), name)
+                await self.async_request("SetConfigFilePath", path)
+                self._config_path = path
+                return await self.async_request("Reload")
+            case "setconfig":
+                config = json.loads(data)["config"]
+                return await self.async_request("SetConfigJson", json.dumps(config))
+            case "patchconfig":
+                return await self.async_request("PatchConfig", json.loads(data))
+        raise UnsupportedError(f"Endpoint not supported by websocket transport: {endpoint}")
+
+    async def async_request(self, command: str, value: Any = None) -> Any:
+        """Send a command and wait for its reply value."""
+        ws = await self._async_connect()
+        message = json.dumps(command if value is None else {command: value})
+        future: asyncio.Future = self.hass.loop.create_future()
+
+        async with self._send_lock:
+            self._pending.append((command, future))
+            try:
+                await ws.send_str(message)
+            except Exception as err:
+                self._pending.remove((command, future))
+                raise ApiError(f"Error sending {command}: {err}") from err
+
+        try:
+            reply = await asyncio.wait_for(future, REQUEST_TIMEOUT)
+        except asyncio.TimeoutError as err:
+            # The reply order can no longer be trusted, start over.
+            await self._async_disconnect()
+            raise ApiError(f"Timeout waiting for {command}") from err
+
+        if reply.get("result") != "Ok":
+            raise ApiError(f"{command} failed: {reply.get('result')}")
+        return reply.get("value")
+
+    async def _async_connect(self) -> aiohttp.ClientWebSocketResponse:
+        if self._ws is not None and not self._ws.closed:
+            return self._ws
+
+        async with self._connect_lock:
+            if self._ws is None or self._ws.closed:
+                session = async_get_clientsession(self.hass)
+                try:
+                    async with asyncio.timeout(REQUEST_TIMEOUT):
+                        self._ws = await session.ws_connect(self.url, heartbeat=30)
+                except (aiohttp.ClientError, TimeoutError) as err:
+                    raise ApiError(f"Unable to connect to {self.url}: {err}") from err
+                self._reader = self.hass.async_create_background_task(
+                    self._async_read(self._ws), f"{DOMAIN} websocket reader"
+                )
+                LOGGER.debug(f"CamillaDSP websocket connected to {self.url}")
+            return self._ws
+
+    async def _async_read(self, ws: aiohttp.ClientWebSocketResponse) -> None:
+        try:
+            async for msg in ws:
+                if msg.type != aiohttp.WSMsgType.TEXT:
+                    continue
+                try:
+                    command, reply = next(iter(json.loads(msg.data).items()))
+                except (ValueError, AttributeError, StopIteration):
+                    LOGGER.debug(f"CamillaDSP invalid websocket message: {msg.data}")
+                    continue
+                if not self._pending:
+                    continue
+                expected, future = self._pending.popleft()
+                if future.done():
+                    continue
+                if command == "Invalid":
+                    # Reply of CamillaDSP to a command it doesn't know
+                    future.set_exception(UnsupportedError(f"{expected} not supported: {reply}"))
+                elif command != expected:
+                    future.set_exception(ApiError(f"Unexpected reply {command} to {expected}"))
+                else:
+                    future.set_result(reply)
+        finally:
+            if self._ws is ws or self._ws is None:
+                self._ws = None
+                self._fail_pending(ApiError("Websocket connection closed"))
+            LOGGER.debug(f"CamillaDSP websocket to {self.url} closed")
+
+    def _fail_pending(self, err: Exception) -> None:
+        while self._pending:
+            _, future = self._pending.popleft()
+            if not future.done():
+                future.set_exception(err)
+
+    async def _async_disconnect(self) -> None:
+        ws, self._ws = self._ws, None
+        if ws is not None:
+            await ws.close()
+        self._fail_pending(ApiError("Websocket connection closed"))
+
+    async def async_close(self) -> None:
+        """Close the websocket connection."""
+        await self._async_disconnect()
+        if self._reader is not None:
+            self._reader.cancel()
+            self._reader = None
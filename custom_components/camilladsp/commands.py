@@ -0,0 +1,81 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+import logging
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, MAX_IN_FLIGHT_COMMANDS
+
+LOGGER = logging.getLogger(__name__)
+
+
+class CDSPCommandQueue:
+    """Latest-wins scheduler for parameter writes to one CamillaDSP instance.
+
+    Writes are keyed by parameter. While a write of a parameter is in flight,
+    newer values for it replace each other and only the newest one is sent
+    next. Callers are released once their value or a newer one was written.
+    """
+
+    def __init__(self, hass: HomeAssistant, max_in_flight: int = MAX_IN_FLIGHT_COMMANDS) -> None:
+        self.hass = hass
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self._pending: dict[str, tuple[Any, Callable[[Any], Awaitable[Any]], list[asyncio.Future]]] = {}
+        self._workers: dict[str, asyncio.Task] = {}
+
+        self.sent: int = 0
+        self.dropped: int = 0
+
+    async def async_submit(self, key: str, value: Any, write: Callable[[Any], Awaitable[Any]]) -> None:
+        """Queue a write of value for key and wait until it is superseded or written."""
+        future: asyncio.Future = self.hass.loop.create_future()
+
+        if key in self._pending:
+            _, _, waiters = self._pending[key]
+            self.dropped += 1
+            LOGGER.debug(f"CamillaDSP command {key} coalesced, {self.dropped} dropped so far")
+        else:
+            waiters = []
+        waiters.append(future)
+        self._pending[key] = (value, write, waiters)
+
+        if key not in self._workers:
+            self._workers[key] = self.hass.async_create_background_task(
+                self._async_worker(key), f"{DOMAIN} command {key}"
+            )
+
+        await future
+
+    async def _async_worker(self, key: str) -> None:
+        try:
+            while key in self._pending:
+                value, write, waiters = self._pending.pop(key)
+                try:
+                    async with self._semaphore:
+                        await write(value)
+                    self.sent += 1
+                except asyncio.CancelledError:
+                    for waiter in waiters:
+                        waiter.cancel()
+                    raise
+                except Exception as err:  # pylint: disable=broad-except
+                    for waiter in waiters:
+                        if not waiter.done():
+                            waiter.set_exception(err)
+                else:
+                    for waiter in waiters:
+                        if not waiter.done():
+                            waiter.set_result(None)
+        finally:
+            self._workers.pop(key, None)
+
+    def async_shutdown(self) -> None:
+        """Cancel queued and running writes."""
+        for worker in self._workers.values():
+            worker.cancel()
+        self._workers.clear()
+        for _, _, waiters in self._pending.values():
+            for waiter in waiters:
+                waiter.cancel()
+        self._pending.clear()
@@ -7,26 +7,114 @@ import voluptuous as vol
 
 from homeassistant import config_entries, exceptions
 from homeassistant.config_entries import ConfigFlowResult
+from homeassistant.const import CONF_NAME
+from homeassistant.components.zeroconf import ZeroconfServiceInfo
 from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import config_validation as cv, entity_registry as er, selector
 
-from .cdsp import CDSPClient
+from .cdsp import ApiError, CDSPClient, make_cdsp_id
 from .const import (
+    CONFIG_DISCOVERY_HOSTS,
+    CONFIG_DISCOVERY_PORT,
+    CONFIG_GROUP_MEMBERS,
+    CONFIG_GROUP_OFFSETS,
+    CONFIG_LEVEL_SAMPLE_RATE,
+    CONFIG_LEVEL_SENSORS,
+    CONFIG_LEVEL_WINDOW,
+    CONFIG_POLL_FAST,
+    CONFIG_POLL_MAX_BACKOFF,
+    CONFIG_POLL_NORMAL,
+    CONFIG_POLL_SLOW,
+    CONFIG_TRANSPORT,
     CONFIG_URL,
     CONFIG_VOLUME_MAX,
     CONFIG_VOLUME_MIN,
     CONFIG_VOLUME_STEP,
+    DEFAULT_DISCOVERY_PORT,
+    DEFAULT_LEVEL_SAMPLE_RATE,
+    DEFAULT_LEVEL_SENSORS,
+    DEFAULT_LEVEL_WINDOW,
+    DEFAULT_POLL_FAST,
+    DEFAULT_POLL_MAX_BACKOFF,
+    DEFAULT_POLL_NORMAL,
+    DEFAULT_POLL_SLOW,
     DOMAIN,
+    GROUP_OFFSET_MAX,
+    GROUP_OFFSET_MIN,
     NAME,
+    TRANSPORT_HTTP,
+    TRANSPORT_WEBSOCKET,
 )
+from .discovery import InvalidHosts, async_discover, async_probe_url, parse_hosts
 
 _LOGGER = logging.getLogger(__name__)
 
 DATA_SCHEMA = vol.Schema(
     {
-        vol.Required(CONFIG_URL): str
+        vol.Required(CONFIG_URL): str,
+        vol.Optional(CONFIG_TRANSPORT, default=TRANSPORT_HTTP): vol.In(
+            [TRANSPORT_HTTP, TRANSPORT_WEBSOCKET]
+        ),
     }
 )
 
+DISCOVERY_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONFIG_DISCOVERY_HOSTS): str,
+        vol.Optional(CONFIG_DISCOVERY_PORT, default=DEFAULT_DISCOVERY_PORT): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=65535)
+        ),
+    }
+)
+
+DEFAULT_OPTIONS = {
+    CONFIG_VOLUME_MIN: -50,
+    CONFIG_VOLUME_MAX: 0,
+    CONFIG_VOLUME_STEP: 1,
+    CONFIG_POLL_FAST: DEFAULT_POLL_FAST,
+    CONFIG_POLL_NORMAL: DEFAULT_POLL_NORMAL,
+    CONFIG_POLL_SLOW: DEFAULT_POLL_SLOW,
+    CONFIG_POLL_MAX_BACKOFF: DEFAULT_POLL_MAX_BACKOFF,
+}
+
+GROUP_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_NAME): str,
+        vol.Required(CONFIG_GROUP_MEMBERS): selector.EntitySelector(
+            selector.EntitySelectorConfig(domain="media_player", integration=DOMAIN, multiple=True)
+        ),
+    }
+)
+
+def get_group_options_schema(members: list[str], init_values: dict[str, Any]) -> vol.Schema:
+    """Volume options of a group and one dB offset per member."""
+    offsets = init_values.get(CONFIG_GROUP_OFFSETS, {})
+    return vol.Schema(
+    {
+        vol.Optional(CONFIG_VOLUME_MIN,
+                     default=init_values.get(CONFIG_VOLUME_MIN, -50)): vol.All(vol.Coerce(float),
+                                                                               vol.Range(min=-100, max=0)),
+        vol.Optional(CONFIG_VOLUME_MAX,
+                     default=init_values.get(CONFIG_VOLUME_MAX, 0)): vol.All(vol.Coerce(float),
+                                                                             vol.Range(min=-100, max=0)),
+        vol.Optional(CONFIG_VOLUME_STEP,
+                     default=init_values.get(CONFIG_VOLUME_STEP, 1)): vol.All(vol.Coerce(float),
+                                                                              vol.Range(min=0, max=100)),
+        **{
+            vol.Optional(member, default=offsets.get(member, 0.0)): selector.NumberSelector(
+                selector.NumberSelectorConfig(min=GROUP_OFFSET_MIN, max=GROUP_OFFSET_MAX, step=0.5,
+                                              unit_of_measurement="dB", mode=selector.NumberSelectorMode.BOX)
+            )
+            for member in members
+        },
+    }
+)
+
+def split_group_options(members: list[str], data: dict[str, Any]) -> dict[str, Any]:
+    options = {key: value for key, value in data.items() if key not in members}
+    options[CONFIG_GROUP_OFFSETS] = {member: float(data.get(member, 0.0)) for member in members}
+    return options
+
 def get_options_schema(init_values: dict[str, Any]) -> vol.Schema:
     return vol.Schema(
     {
@@ -38,16 +126,61 @@ def get_options_schema(init_values: dict[str, Any]) -> vol.Schema:
                                                                       vol.Range(min=-100, max=0)),
         vol.Optional(CONFIG_VOLUME_STEP,
                      default=init_values[CONFIG_VOLUME_STEP]): vol.All(vol.Coerce(float),
-                                                                       vol.Range(min=0, max=100))
+                                                                       vol.Range(min=0, max=100)),
+        vol.Optional(CONFIG_POLL_FAST,
+                     default=init_values.get(CONFIG_POLL_FAST, DEFAULT_POLL_FAST)): vol.All(vol.Coerce(float),
+                                                                                            vol.Range(min=0.5, max=3600)),
+        vol.Optional(CONFIG_POLL_NORMAL,
+                     default=init_values.get(CONFIG_POLL_NORMAL, DEFAULT_POLL_NORMAL)): vol.All(vol.Coerce(float),
+                                                                                                vol.Range(min=0.5, max=3600)),
+        vol.Optional(CONFIG_POLL_SLOW,
+                     default=init_values.get(CONFIG_POLL_SLOW, DEFAULT_POLL_SLOW)): vol.All(vol.Coerce(float),
+                                                                                            vol.Range(min=0.5, max=3600)),
+        vol.Optional(CONFIG_POLL_MAX_BACKOFF,
+                     default=init_values.get(CONFIG_POLL_MAX_BACKOFF, DEFAULT_POLL_MAX_BACKOFF)): vol.All(vol.Coerce(float),
+                                                                                                          vol.Range(min=0.5, max=3600)),
+        vol.Optional(CONFIG_LEVEL_SENSORS,
+                     default=init_values.get(CONFIG_LEVEL_SENSORS, DEFAULT_LEVEL_SENSORS)): bool,
+        vol.Optional(CONFIG_LEVEL_SAMPLE_RATE,
+                     default=init_values.get(CONFIG_LEVEL_SAMPLE_RATE, DEFAULT_LEVEL_SAMPLE_RATE)): vol.All(vol.Coerce(float),
+                                                                                                            vol.Range(min=0.1, max=50)),
+        vol.Optional(CONFIG_LEVEL_WINDOW,
+                     default=init_values.get(CONFIG_LEVEL_WINDOW, DEFAULT_LEVEL_WINDOW)): vol.All(vol.Coerce(float),
+                                                                                                  vol.Range(min=1, max=3600))
     }
 )
 
 async def validate_data_input(hass: HomeAssistant, data: dict) -> dict[str, Any]:
 
     url = data[CONFIG_URL]
-    cdsp = CDSPClient(hass, url)
-    if not await cdsp.update():
-        raise CannotConnect
+    cdsp = CDSPClient(hass, url, data.get(CONFIG_TRANSPORT, TRANSPORT_HTTP))
+    try:
+        # Only reachability is checked, the first poll happens after setup.
+        await cdsp.async_probe()
+    except ApiError as err:
+        raise CannotConnect from err
+    finally:
+        await cdsp.async_close()
+
+def validate_group_input(hass: HomeAssistant, data: dict) -> None:
+
+    members = data[CONFIG_GROUP_MEMBERS]
+    if not members:
+        raise InvalidMember
+    registry = er.async_get(hass)
+    for member in members:
+        # Groups can't be members of other groups.
+        entity = registry.async_get(member)
+        entry = hass.config_entries.async_get_entry(entity.config_entry_id) if entity is not None else None
+        if entry is None or entry.domain != DOMAIN or CONFIG_GROUP_MEMBERS in entry.data:
+            raise InvalidMember
+
+def validate_group_options_input(data: dict) -> None:
+
+    if data[CONFIG_VOLUME_MAX] > 0 or data[CONFIG_VOLUME_MIN] > data[CONFIG_VOLUME_MAX]:
+        raise InvalidValue
+    if data[CONFIG_VOLUME_STEP] < 0:
+        raise InvalidValue
 
 async def validate_options_input(hass: HomeAssistant, data: dict) -> dict[str, Any]:
 
@@ -55,30 +188,131 @@ async def validate_options_input(hass: HomeAssistant, data: dict) -> dict[str, A
         raise InvalidValue
     if data[CONFIG_VOLUME_STEP] < 0:
         raise InvalidValue
+    if not (data[CONFIG_POLL_FAST] <= data[CONFIG_POLL_NORMAL]
+            <= data[CONFIG_POLL_SLOW] <= data[CONFIG_POLL_MAX_BACKOFF]):
+        raise InvalidValue
 
 
 class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    def __init__(self) -> None:
+        self._group: dict[str, Any] = {}
+        self._discovered: list[str] = []
+        self._zeroconf_url: str = ""
+
     async def async_step_user(self, user_input=None):
+        return self.async_show_menu(step_id="user", menu_options=["discover", "device", "group"])
+
+    @callback
+    def _async_configured_ids(self) -> set[str]:
+        """Ids of the configured instances, also of entries without unique id."""
+        ids = {entry.unique_id for entry in self._async_current_entries(include_ignore=False)}
+        ids.update(
+            make_cdsp_id(entry.data[CONFIG_URL])
+            for entry in self._async_current_entries(include_ignore=False)
+            if CONFIG_URL in entry.data
+        )
+        return ids
+
+    @callback
+    def _async_create_device_entry(self, data: dict[str, Any]) -> ConfigFlowResult:
+        return self.async_create_entry(title=NAME, data=data, options=dict(DEFAULT_OPTIONS))
+
+    async def async_step_discover(self, user_input=None):
+        errors = {}
+
+        if user_input is not None:
+            try:
+                urls = parse_hosts(user_input[CONFIG_DISCOVERY_HOSTS], user_input[CONFIG_DISCOVERY_PORT])
+            except InvalidHosts:
+                errors[CONFIG_DISCOVERY_HOSTS] = "invalid_hosts"
+            else:
+                configured = self._async_configured_ids()
+                urls = [url for url in urls if make_cdsp_id(url) not in configured]
+                self._discovered = await async_discover(self.hass, urls)
+                if self._discovered:
+                    return await self.async_step_discover_select()
+                errors["base"] = "no_devices_found"
+
+        return self.async_show_form(
+            step_id="discover", data_schema=DISCOVERY_SCHEMA, errors=errors
+        )
+
+    async def async_step_discover_select(self, user_input=None):
+        errors = {}
+
+        if user_input is not None:
+            selected = user_input[CONFIG_URL]
+            if selected:
+                # A flow creates one entry, the other instances get their own flow.
+                for url in selected[1:]:
+                    self.hass.async_create_task(
+                        self.hass.config_entries.flow.async_init(
+                            DOMAIN,
+                            context={"source": config_entries.SOURCE_IMPORT},
+                            data={CONFIG_URL: url, CONFIG_TRANSPORT: TRANSPORT_HTTP},
+                        )
+                    )
+                return await self.async_step_import({CONFIG_URL: selected[0], CONFIG_TRANSPORT: TRANSPORT_HTTP})
+            errors["base"] = "no_selection"
+
+        return self.async_show_form(
+            step_id="discover_select",
+            data_schema=vol.Schema(
+                {vol.Required(CONFIG_URL, default=self._discovered): cv.multi_select(
+                    {url: url for url in self._discovered}
+                )}
+            ),
+            errors=errors,
+        )
+
+    async def async_step_import(self, import_data: dict[str, Any]):
+        """Add an instance found by the discovery, it was already probed."""
+        await self.async_set_unique_id(make_cdsp_id(import_data[CONFIG_URL]))
+        self._abort_if_unique_id_configured()
+        if self.unique_id in self._async_configured_ids():
+            return self.async_abort(reason="already_configured")
+        return self._async_create_device_entry(import_data)
+
+    async def async_step_zeroconf(self, discovery_info: ZeroconfServiceInfo):
+        url = f"http://{discovery_info.host}:{discovery_info.port or DEFAULT_DISCOVERY_PORT}"
+        await self.async_set_unique_id(make_cdsp_id(url))
+        self._abort_if_unique_id_configured()
+        if self.unique_id in self._async_configured_ids():
+            return self.async_abort(reason="already_configured")
+        if not await async_probe_url(self.hass, url):
+            return self.async_abort(reason="cannot_connect")
+
+        self._zeroconf_url = url
+        self.context["title_placeholders"] = {"url": url}
+        return await self.async_step_zeroconf_confirm()
+
+    async def async_step_zeroconf_confirm(self, user_input=None):
+        if user_input is None:
+            return self.async_show_form(
+                step_id="zeroconf_confirm", description_placeholders={"url": self._zeroconf_url}
+            )
+        return self._async_create_device_entry({CONFIG_URL: self._zeroconf_url, CONFIG_TRANSPORT: TRANSPORT_HTTP})
+
+    async def async_step_device(self, user_input=None):
         errors = {}
 
         if user_input is None:
             return self.async_show_form(
-                step_id="user", data_schema=DATA_SCHEMA, errors=errors
+                step_id="device", data_schema=DATA_SCHEMA, errors=errors
             )
 
+        await self.async_set_unique_id(make_cdsp_id(user_input[CONFIG_URL]))
+        self._abort_if_unique_id_configured()
+        if self.unique_id in self._async_configured_ids():
+            return self.async_abort(reason="already_configured")
+
         try:
             await validate_data_input(self.hass, user_input)
 
-            return self.async_create_entry(title=NAME,
-                                           data=user_input,
-                                           options={
-                                               CONFIG_VOLUME_MIN: -50,
-                                               CONFIG_VOLUME_MAX: 0,
-                                               CONFIG_VOLUME_STEP: 1
-                                           })
+            return self._async_create_device_entry(user_input)
         except CannotConnect:
             errors["base"] = "cannot_connect"
         except InvalidHost:
@@ -88,7 +322,39 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             errors["base"] = "unknown"
 
         return self.async_show_form(
-            step_id="user", data_schema=DATA_SCHEMA, errors=errors
+            step_id="device", data_schema=DATA_SCHEMA, errors=errors
+        )
+
+    async def async_step_group(self, user_input=None):
+        errors = {}
+
+        if user_input is not None:
+            try:
+                validate_group_input(self.hass, user_input)
+                self._group = user_input
+                return await self.async_step_group_options()
+            except InvalidMember:
+                errors[CONFIG_GROUP_MEMBERS] = "invalid_member"
+
+        return self.async_show_form(
+            step_id="group", data_schema=GROUP_SCHEMA, errors=errors
+        )
+
+    async def async_step_group_options(self, user_input=None):
+        errors = {}
+        members = self._group[CONFIG_GROUP_MEMBERS]
+
+        if user_input is not None:
+            try:
+                validate_group_options_input(user_input)
+                return self.async_create_entry(title=self._group[CONF_NAME],
+                                               data={CONFIG_GROUP_MEMBERS: members},
+                                               options=split_group_options(members, user_input))
+            except InvalidValue:
+                errors["base"] = "invalid_value"
+
+        return self.async_show_form(
+            step_id="group_options", data_schema=get_group_options_schema(members, {}), errors=errors
         )
 
 
@@ -107,6 +373,9 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
     ) -> ConfigFlowResult:
         errors = {}
 
+        if CONFIG_GROUP_MEMBERS in self.config_entry.data:
+            return await self.async_step_group(user_input)
+
         if user_input is None:
             return self.async_show_form(
                 step_id="init", data_schema=get_options_schema(self.config_entry.options), errors=errors
@@ -127,6 +396,24 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
             step_id="init", data_schema=get_options_schema(self.config_entry.options), errors=errors
         )
 
+    async def async_step_group(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        errors = {}
+        members = self.config_entry.data[CONFIG_GROUP_MEMBERS]
+
+        if user_input is not None:
+            try:
+                validate_group_options_input(user_input)
+                return self.async_create_entry(title="GroupOptions",
+                                               data=split_group_options(members, user_input))
+            except InvalidValue:
+                errors["base"] = "invalid_value"
+
+        return self.async_show_form(
+            step_id="group", data_schema=get_group_options_schema(members, self.config_entry.options), errors=errors
+        )
+
 
 class CannotConnect(exceptions.HomeAssistantError):
     """Error to indicate we cannot connect."""
@@ -137,3 +424,6 @@ class InvalidHost(exceptions.HomeAssistantError):
 
 class InvalidValue(exceptions.HomeAssistantError):
     """Error to indicate there is an invalid hostname."""
+
+class InvalidMember(exceptions.HomeAssistantError):
+    """Error to indicate a group member is not a CamillaDSP instance."""
@@ -0,0 +1,163 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+import copy
+from dataclasses import dataclass
+import hashlib
+import json
+import logging
+from typing import Any
+from urllib.parse import quote
+
+from homeassistant.core import HomeAssistant
+
+from .const import CONFIG_GAIN_MAX, CONFIG_GAIN_MIN, CONFIG_PREFETCH_PARALLEL, DOMAIN, FADER_VOLUME_MAX, FADER_VOLUME_MIN
+
+LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class CachedConfig:
+    """A stored config, ready to be sent with setconfig."""
+
+    name: str
+    modified: Any
+    hash: str
+    document: str
+    config: Any
+
+
+@dataclass(frozen=True, slots=True)
+class ConfigParameter:
+    """A numeric value of the running config that can be patched."""
+
+    path: tuple[str | int, ...]
+    name: str
+    min: float
+    max: float
+
+
+class CDSPConfigCache:
+    """Cache of stored config documents, keyed by name and content hash.
+
+    Stored configs whose modification time changed are downloaded in the
+    background, so a source switch can send the config without fetching it
+    first.
+    """
+
+    def __init__(self, hass: HomeAssistant, get_api: Callable[[str], Awaitable[Any]]) -> None:
+        self.hass = hass
+        self._get_api = get_api
+        self._configs: dict[str, CachedConfig] = {}
+        self._prefetch: asyncio.Task | None = None
+
+    def get(self, name: str) -> CachedConfig | None:
+        return self._configs.get(name)
+
+    def add(self, name: str, config: Any, modified: Any = None) -> CachedConfig:
+        """Cache a parsed config document."""
+        document = json.dumps({"configFileName": name, "config": config})
+        contentHash = hashlib.md5(document.encode('utf-8')).hexdigest()
+        cached = self._configs.get(name)
+        if cached is None or cached.hash != contentHash or cached.modified != modified:
+            if modified is None and cached is not None:
+                modified = cached.modified
+            cached = CachedConfig(name=name, modified=modified, hash=contentHash,
+                                  document=document, config=config)
+            self._configs[name] = cached
+        return cached
+
+    def async_update_index(self, storedConfigs: list[dict[str, Any]]) -> None:
+        """Drop removed configs and prefetch new or modified ones."""
+        index = {
+            config["name"]: config.get("lastModified")
+            for config in storedConfigs
+            if config.get("name") is not None
+        }
+        for name in list(self._configs):
+            if name not in index:
+                self._configs.pop(name)
+
+        stale = [
+            (name, modified)
+            for name, modified in index.items()
+            if (cached := self._configs.get(name)) is None or cached.modified != modified
+        ]
+        if stale and (self._prefetch is None or self._prefetch.done()):
+            self._prefetch = self.hass.async_create_background_task(
+                self._async_prefetch(stale), f"{DOMAIN} config prefetch"
+            )
+
+    async def _async_prefetch(self, stale: list[tuple[str, Any]]) -> None:
+        semaphore = asyncio.Semaphore(CONFIG_PREFETCH_PARALLEL)
+
+        async def fetch(name: str, modified: Any) -> None:
+            async with semaphore:
+                try:
+                    config = json.loads(await self._get_api(f"getconfigfile?name={quote(name)}"))
+                except Exception as err:  # pylint: disable=broad-except
+                    LOGGER.debug(f"CamillaDSP prefetch of config {name} failed: {err}")
+                    return
+            self.add(name, config, modified)
+
+        await asyncio.gather(*(fetch(name, modified) for name, modified in stale))
+
+    def async_shutdown(self) -> None:
+        if self._prefetch is not None:
+            self._prefetch.cancel()
+            self._prefetch = None
+
+
+def build_config_patch(config: dict[str, Any], path: tuple[str | int, ...], value: Any) -> tuple[dict[str, Any], dict[str, Any]]:
+    """Return the config with value set at path, and the patch doing that.
+
+    Patches are merged into objects but replace lists, so a path through a
+    list (eg. a mixer mapping) patches the whole list.
+    """
+    if not path:
+        raise ValueError("Empty config path")
+    patched = copy.deepcopy(config)
+    node: Any = patched
+    for key in path[:-1]:
+        node = node[key]
+    if isinstance(node, list):
+        if not isinstance(path[-1], int) or not -len(node) <= path[-1] < len(node):
+            raise KeyError(path[-1])
+    elif path[-1] not in node:
+        raise KeyError(path[-1])
+    node[path[-1]] = value
+
+    patch: dict[str, Any] = {}
+    target = patch
+    source: Any = patched
+    for index, key in enumerate(path):
+        source = source[key]
+        if index == len(path) - 1 or isinstance(source, list):
+            target[key] = source
+            break
+        target = target.setdefault(key, {})
+    return patched, patch
+
+
+def config_parameters(config: dict[str, Any] | None) -> list[ConfigParameter]:
+    """Filter gains, loudness reference levels and mixer gains of a config."""
+    if not isinstance(config, dict):
+        return []
+    parameters = []
+    for name, definition in (config.get("filters") or {}).items():
+        values = (definition or {}).get("parameters") or {}
+        if isinstance(values.get("gain"), (int, float)) and not isinstance(values["gain"], bool):
+            parameters.append(ConfigParameter(("filters", name, "parameters", "gain"),
+                                              f"Filter {name} gain", CONFIG_GAIN_MIN, CONFIG_GAIN_MAX))
+        if isinstance(values.get("reference_level"), (int, float)):
+            parameters.append(ConfigParameter(("filters", name, "parameters", "reference_level"),
+                                              f"Filter {name} reference level", FADER_VOLUME_MIN, FADER_VOLUME_MAX))
+    for name, definition in (config.get("mixers") or {}).items():
+        for mappingIndex, mapping in enumerate((definition or {}).get("mapping") or []):
+            for sourceIndex, source in enumerate(mapping.get("sources") or []):
+                if isinstance(source.get("gain"), (int, float)):
+                    parameters.append(ConfigParameter(
+                        ("mixers", name, "mapping", mappingIndex, "sources", sourceIndex, "gain"),
+                        f"Mixer {name} out {mapping.get('dest')} in {source.get('channel')} gain",
+                        CONFIG_GAIN_MIN, CONFIG_GAIN_MAX,
+                    ))
+    return parameters
@@ -10,3 +10,153 @@ CONFIG_VOLUME_STEP = "volume_step"
 ATTR_VOLUME_DB = "volume_db"
 ATTR_CAPTURE_RATE = "capturerate"
 SERVICE_VOLUME_DB_SET = "volume_db_set"
+SERVICE_VOLUME_FADE = "volume_fade"
+ATTR_DURATION = "duration"
+ATTR_CURVE = "curve"
+
+# Seconds between refreshes of the active config name and the stored config list
+CONFIG_LIST_REFRESH_INTERVAL = 60
+
+CONFIG_TRANSPORT = "transport"
+TRANSPORT_HTTP = "http"
+TRANSPORT_WEBSOCKET = "websocket"
+
+# Parameter writes sent concurrently to one CamillaDSP instance
+MAX_IN_FLIGHT_COMMANDS = 2
+
+# Seconds after the last command before changed fields are read back
+CONFIRM_DELAY = 1
+
+CONFIG_POLL_FAST = "poll_fast"
+CONFIG_POLL_NORMAL = "poll_normal"
+CONFIG_POLL_SLOW = "poll_slow"
+CONFIG_POLL_MAX_BACKOFF = "poll_max_backoff"
+
+# Poll intervals in seconds
+DEFAULT_POLL_FAST = 1
+DEFAULT_POLL_NORMAL = 10
+DEFAULT_POLL_SLOW = 60
+DEFAULT_POLL_MAX_BACKOFF = 300
+
+# Seconds of fast polling after a user command or a state change
+POLL_FAST_WINDOW = 10
+# Seconds without state change after which a DSP that is not playing is polled slowly
+POLL_IDLE_TIMEOUT = 300
+
+CONFIG_LEVEL_SENSORS = "level_sensors"
+CONFIG_LEVEL_SAMPLE_RATE = "level_sample_rate"
+CONFIG_LEVEL_WINDOW = "level_window"
+
+DEFAULT_LEVEL_SENSORS = False
+# Level samples per second
+DEFAULT_LEVEL_SAMPLE_RATE = 10
+# Seconds of samples aggregated into one published level state
+DEFAULT_LEVEL_WINDOW = 30
+# Lowest signal level in dB, CamillaDSP reports silence as -1000 dB
+LEVEL_FLOOR_DB = -100.0
+
+# Stored configs downloaded concurrently when filling the config cache
+CONFIG_PREFETCH_PARALLEL = 2
+
+# hass.data key of the poll scheduler shared by all config entries
+DATA_SCHEDULER = f"{DOMAIN}_scheduler"
+# Polls running concurrently against one host
+MAX_POLLS_PER_HOST = 2
+
+# Seconds to wait for one API request and for a whole update cycle
+REQUEST_TIMEOUT = 5
+UPDATE_TIMEOUT = 10
+# Failed update cycles after which only the status is probed
+BREAKER_THRESHOLD = 3
+
+# Volume updates per second during a fade
+FADE_MAX_RATE = 5
+# Fade curves, mapping fade progress 0..1 to volume progress 0..1 (in dB)
+FADE_CURVES = {
+    "linear": lambda x: x,
+    "ease_in": lambda x: x * x,
+    "ease_out": lambda x: 1 - (1 - x) * (1 - x),
+}
+
+# Range of the aux fader volume entities in dB
+FADER_VOLUME_MIN = -100.0
+FADER_VOLUME_MAX = 20.0
+
+# Services saving and restoring volume, mute, faders and config
+SERVICE_SNAPSHOT = "snapshot"
+SERVICE_RESTORE = "restore"
+ATTR_SNAPSHOT = "snapshot"
+DEFAULT_SNAPSHOT = "default"
+# hass.data key of the saved snapshots
+DATA_SNAPSHOTS = f"{DOMAIN}_snapshots"
+# Instances restored concurrently
+RESTORE_PARALLEL = 8
+
+# Version of the stored last known state and seconds to wait before writing it
+STORAGE_VERSION = 1
+STORAGE_SAVE_DELAY = 10
+
+# Smallest change of a status value that is published, smaller changes are jitter
+STATUS_THRESHOLDS = {
+    "processing_load": 1.0,
+    "rate_adjust": 0.0001,
+    "buffer_level": 100,
+    "clipped_samples": 1,
+}
+
+# Nominal sample rates, the measured capture rate is reported as the closest
+# one within CAPTURERATE_TOLERANCE (relative)
+NOMINAL_SAMPLE_RATES = (8000, 11025, 16000, 22050, 32000, 44100, 48000, 88200, 96000,
+                        176400, 192000, 352800, 384000, 705600, 768000)
+CAPTURERATE_TOLERANCE = 0.02
+
+# Rolling health statistics: window name to (duration in s, number of buckets)
+HEALTH_WINDOWS = {
+    "5m": (300, 30),
+    "1h": (3600, 60),
+    "24h": (86400, 96),
+}
+# Width of the processing load histogram bins in %
+HEALTH_LOAD_BIN = 5
+# Seconds between updates of the rolling statistics attributes while the status doesn't change
+HEALTH_ATTRS_INTERVAL = 60
+
+# Messages per second of a level stream subscription, by default and at most
+LEVEL_STREAM_DEFAULT_RATE = 10
+LEVEL_STREAM_MAX_RATE = 50
+
+# Volume groups: member media players and their dB offsets
+CONFIG_GROUP_MEMBERS = "members"
+CONFIG_GROUP_OFFSETS = "offsets"
+# hass.data key of the group coordinators
+DATA_GROUPS = f"{DOMAIN}_groups"
+# Seconds between group refreshes, to pick up members set up after the group
+GROUP_REFRESH_INTERVAL = 30
+# Range of a member offset in dB
+GROUP_OFFSET_MIN = -30.0
+GROUP_OFFSET_MAX = 30.0
+
+# LAN discovery: default camillagui port, hosts probed concurrently and at
+# most per scan, and seconds to wait for one probe
+DEFAULT_DISCOVERY_PORT = 5005
+DISCOVERY_PARALLEL = 128
+DISCOVERY_MAX_HOSTS = 1024
+DISCOVERY_TIMEOUT = 1
+CONFIG_DISCOVERY_HOSTS = "hosts"
+CONFIG_DISCOVERY_PORT = "port"
+
+# Range of the filter and mixer gain entities in dB
+CONFIG_GAIN_MIN = -40.0
+CONFIG_GAIN_MAX = 40.0
+# Service changing one value of the running config
+SERVICE_SET_CONFIG_VALUE = "set_config_value"
+ATTR_PATH = "path"
+ATTR_VALUE = "value"
+
+# Events fired on the bus, with old and new value
+EVENT_STATE_CHANGED = f"{DOMAIN}_state_changed"
+EVENT_CAPTURERATE_CHANGED = f"{DOMAIN}_capturerate_changed"
+EVENT_CONFIG_CHANGED = f"{DOMAIN}_config_changed"
+EVENT_CLIPPING_DETECTED = f"{DOMAIN}_clipping_detected"
+# Seconds a change has to last before its event is fired
+EVENT_DEBOUNCE = 5
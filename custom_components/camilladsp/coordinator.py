@@ -1,12 +1,36 @@
+import asyncio
+import dataclasses
+from datetime import timedelta
 import logging
+import random
+import time
+from typing import TYPE_CHECKING, Any
 
-from homeassistant.core import HomeAssistant
-from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.components.media_player import MediaPlayerState
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.debounce import Debouncer
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
-from .cdsp import CDSPClient
-from .const import DOMAIN
-from .model import CDSPData
+from .cdsp import ApiError, CDSPClient
+from .const import (
+    CONFIRM_DELAY,
+    DEFAULT_POLL_FAST,
+    DEFAULT_POLL_MAX_BACKOFF,
+    DEFAULT_POLL_SLOW,
+    DOMAIN,
+    FADE_CURVES,
+    FADE_MAX_RATE,
+    POLL_FAST_WINDOW,
+    POLL_IDLE_TIMEOUT,
+)
+from .events import CDSPEventDispatcher
+from .levels import LevelSampler
+from .metrics import LatencyHistogram
+from .model import CDSPData, CDSPFader
+from .store import CDSPStateStore
+
+if TYPE_CHECKING:
+    from .scheduler import CDSPPollScheduler
 
 LOGGER = logging.getLogger(__name__)
 
@@ -14,22 +38,273 @@ LOGGER = logging.getLogger(__name__)
 class CDSPDataUpdateCoordinator(DataUpdateCoordinator[CDSPData]):  # type: ignore[misc]
     """Class to manage fetching CamillaDSP data from single endpoint."""
 
-    def __init__(self, hass: HomeAssistant, cdsp: CDSPClient, interval: float) -> None:
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        cdsp: CDSPClient,
+        interval: timedelta,
+        fast_interval: float = DEFAULT_POLL_FAST,
+        slow_interval: float = DEFAULT_POLL_SLOW,
+        max_backoff: float = DEFAULT_POLL_MAX_BACKOFF,
+    ) -> None:
         """Initialize the coordinator."""
-        super().__init__(hass, LOGGER, name=DOMAIN, update_interval=interval)
+        # Listeners are only called when a poll returns a different snapshot.
+        super().__init__(hass, LOGGER, name=DOMAIN, update_interval=interval, always_update=False)
         self.cdsp = cdsp
+        self.levels: LevelSampler | None = None
+        self.store: CDSPStateStore | None = None
+        self.events: CDSPEventDispatcher | None = None
+        self.poll_durations = LatencyHistogram()
+        self.last_poll_duration: float | None = None
+        # Called after every poll, for values that aren't part of the snapshot
+        self._poll_listeners: list[CALLBACK_TYPE] = []
+        # Running volume fade, cancelled by any other volume or mute command
+        self._fade_task: asyncio.Task | None = None
+
+        # Polls are driven by the integration-wide scheduler once registered,
+        # until then the coordinator schedules itself.
+        self.scheduler: CDSPPollScheduler | None = None
+        self.poll_interval: timedelta = interval
+
+        # Adaptive polling: fast for a while after a command or a state change,
+        # slow while the DSP is in standby or idle, and exponential backoff
+        # with jitter while it is unreachable.
+        self._normal_interval = interval.total_seconds()
+        self._fast_interval = fast_interval
+        self._slow_interval = slow_interval
+        self._max_backoff = max_backoff
+        self._fast_until: float = 0
+        self._last_state: str | None = None
+        self._last_state_change: float = time.monotonic()
+        self._failures: int = 0
+
+        self._confirm_debouncer = Debouncer(
+            hass, LOGGER, cooldown=CONFIRM_DELAY, immediate=False, function=self._async_confirm
+        )
 
     async def _async_update_data(self) -> CDSPData:
         if self.hass.is_stopping:
             return None
 
+        started = time.perf_counter()
         try:
-            return await self.cdsp.update()
+            data = await self.cdsp.update()
 
         except ApiError as err:
+            self._async_update_failed()
             raise UpdateFailed(f"Error communicating with API: {err}") from err
         except Exception as err:
-            raise ConfigEntryAuthFailed from err
+            self._async_update_failed()
+            raise UpdateFailed(f"Unexpected error updating CamillaDSP: {err!r}") from err
+        finally:
+            self.last_poll_duration = time.perf_counter() - started
+            self.poll_durations.record(self.last_poll_duration)
+            if self._poll_listeners:
+                # Run once the refresh stored the result and called the listeners.
+                self.hass.loop.call_soon(self._async_update_poll_listeners)
+
+        self._async_adapt_interval(data)
+        if self.store is not None:
+            self.store.async_schedule_save(data)
+        if self.events is not None:
+            self.events.async_update(data)
+        return data
+
+    @callback
+    def _async_update_failed(self) -> None:
+        self._async_adapt_interval(None)
+        if self.events is not None:
+            self.events.async_update_unreachable()
+
+    @callback
+    def async_add_poll_listener(self, update_callback: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Listen for every finished poll, also when the snapshot didn't change."""
+        self._poll_listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._poll_listeners.remove(update_callback)
+
+        return remove_listener
+
+    @callback
+    def _async_update_poll_listeners(self) -> None:
+        for update_callback in list(self._poll_listeners):
+            update_callback()
+
+    @callback
+    def _async_adapt_interval(self, data: CDSPData | None) -> None:
+        now = time.monotonic()
+        state = data.state if data is not None else MediaPlayerState.OFF
+
+        if state != self._last_state:
+            if self._last_state is not None:
+                self._fast_until = now + POLL_FAST_WINDOW
+            self._last_state = state
+            self._last_state_change = now
+
+        if state == MediaPlayerState.OFF:
+            self._failures += 1
+            seconds = min(self._max_backoff, self._normal_interval * 2 ** (self._failures - 1))
+            seconds = random.uniform(seconds / 2, seconds)
+        else:
+            self._failures = 0
+            if now < self._fast_until:
+                seconds = self._fast_interval
+            elif state == MediaPlayerState.STANDBY or (
+                state != MediaPlayerState.PLAYING
+                and now - self._last_state_change >= POLL_IDLE_TIMEOUT
+            ):
+                seconds = self._slow_interval
+            else:
+                seconds = self._normal_interval
+
+        self.poll_interval = timedelta(seconds=seconds)
+        if self.scheduler is None:
+            self.update_interval = self.poll_interval
+
+    @callback
+    def _async_user_activity(self) -> None:
+        """Poll fast for a while after a user command."""
+        self._fast_until = time.monotonic() + POLL_FAST_WINDOW
+        if self._failures == 0 and self.poll_interval.total_seconds() > self._fast_interval:
+            self.poll_interval = timedelta(seconds=self._fast_interval)
+            if self.scheduler is not None:
+                self.scheduler.async_reschedule(self, self._fast_interval)
+            else:
+                self.update_interval = self.poll_interval
+                self._schedule_refresh()
+
+    async def async_set_volume(self, volume: float) -> None:
+        self.async_cancel_fade()
+        await self._async_write_volume(volume)
+
+    async def _async_write_volume(self, volume: float) -> None:
+        self._async_user_activity()
+        self._async_apply(volume=volume)
+        try:
+            await self.cdsp.async_set_volume(volume)
+        finally:
+            await self._confirm_debouncer.async_call()
+
+    async def async_set_muted(self, muted: bool) -> None:
+        self.async_cancel_fade()
+        self._async_user_activity()
+        self._async_apply(mute=muted)
+        try:
+            await self.cdsp.async_set_muted(muted)
+        finally:
+            await self._confirm_debouncer.async_call()
+
+    async def async_set_fader_volume(self, index: int, volume: float) -> None:
+        self._async_user_activity()
+        self._async_apply_fader(index, volume=volume)
+        try:
+            await self.cdsp.async_set_fader_volume(index, volume)
+        finally:
+            await self._confirm_debouncer.async_call()
+
+    async def async_set_fader_muted(self, index: int, muted: bool) -> None:
+        self._async_user_activity()
+        self._async_apply_fader(index, mute=muted)
+        try:
+            await self.cdsp.async_set_fader_muted(index, muted)
+        finally:
+            await self._confirm_debouncer.async_call()
+
+    async def async_select_source(self, source: str) -> None:
+        self._async_user_activity()
+        self._async_apply(source=source)
+        try:
+            await self.cdsp.async_select_source(source)
+        finally:
+            await self._confirm_debouncer.async_call()
+
+    async def async_set_config_value(self, path: tuple[str | int, ...], value: Any) -> None:
+        """Change one value of the running config and show it right away."""
+        await self.cdsp.async_set_config_value(path, value)
+        self.async_update_listeners()
+
+    async def async_fade_volume(self, volume: float, duration: float, curve: str) -> None:
+        """Start fading the volume in the background, replacing a running fade."""
+        self.async_cancel_fade()
+        self._fade_task = self.hass.async_create_background_task(
+            self._async_fade(volume, duration, curve), f"{DOMAIN} volume fade {self.cdsp.cdsp_id}"
+        )
+
+    @callback
+    def async_cancel_fade(self) -> None:
+        if self._fade_task is not None:
+            self._fade_task.cancel()
+            self._fade_task = None
+
+    async def _async_fade(self, volume: float, duration: float, curve: str) -> None:
+        """Fade the volume to a target level in steps.
+
+        Steps are at least as long as the volume ramp time of the active
+        config, so CamillaDSP ramps smoothly between them, and never more
+        than FADE_MAX_RATE per second.
+        """
+        if self.data is None:
+            return
+        start = self.data.volume
+        period = max(1 / FADE_MAX_RATE, self.cdsp.volume_ramp_time or 0)
+        steps = max(1, round(duration / period))
+        shape = FADE_CURVES[curve]
+
+        began = self.hass.loop.time()
+        try:
+            for step in range(1, steps + 1):
+                await self._async_write_volume(round(start + (volume - start) * shape(step / steps), 2))
+                if step < steps:
+                    await asyncio.sleep(max(0, began + step * duration / steps - self.hass.loop.time()))
+        finally:
+            if self._fade_task is asyncio.current_task():
+                self._fade_task = None
+
+    @callback
+    def _async_apply(self, **changes: Any) -> None:
+        """Show changed fields right away, without touching the poll schedule."""
+        if self.data is None or not changes:
+            return
+        data = dataclasses.replace(self.data, **changes)
+        if data.faders and ("volume" in changes or "mute" in changes):
+            # The main fader is also exposed as volume and mute.
+            main = CDSPFader(volume=data.volume, mute=data.mute)
+            data = dataclasses.replace(data, faders=(main, *data.faders[1:]))
+        if data == self.data:
+            return
+        self.data = data
+        self.async_update_listeners()
+
+    @callback
+    def _async_apply_fader(self, index: int, **changes: Any) -> None:
+        if index == 0:
+            self._async_apply(**changes)
+            return
+        if self.data is None or index >= len(self.data.faders):
+            return
+        faders = list(self.data.faders)
+        faders[index] = dataclasses.replace(faders[index], **changes)
+        self._async_apply(faders=tuple(faders))
+
+    async def _async_confirm(self) -> None:
+        try:
+            changes = await self.cdsp.async_confirm()
+        except Exception as err:  # pylint: disable=broad-except
+            LOGGER.debug(f"CamillaDSP confirmation read failed: {err}")
+            return
+        for field in [field for field in changes if "_" in field]:
+            name, index = field.split("_")
+            self._async_apply_fader(int(index), **{name: changes.pop(field)})
+        self._async_apply(**changes)
 
-class ApiError(Exception):
-    """Error to indicate something wrong with the API."""
+    async def async_shutdown(self) -> None:
+        """Cancel pending confirmation reads and a running fade."""
+        self._confirm_debouncer.async_cancel()
+        self.async_cancel_fade()
+        if self.levels is not None:
+            self.levels.async_stop()
+        if self.events is not None:
+            self.events.async_stop()
+        await super().async_shutdown()
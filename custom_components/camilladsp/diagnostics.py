@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import dataclasses
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DATA_GROUPS, DOMAIN
+from .coordinator import CDSPDataUpdateCoordinator
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    if (group := hass.data.get(DATA_GROUPS, {}).get(entry.entry_id)) is not None:
+        return {
+            "entry": {
+                "data": dict(entry.data),
+                "options": dict(entry.options),
+            },
+            "data": dataclasses.asdict(group.data) if group.data is not None else None,
+        }
+
+    coordinator: CDSPDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    cdsp = coordinator.cdsp
+
+    return {
+        "entry": {
+            "data": dict(entry.data),
+            "options": dict(entry.options),
+        },
+        "data": dataclasses.asdict(coordinator.data) if coordinator.data is not None else None,
+        "polling": {
+            "last_update_success": coordinator.last_update_success,
+            "poll_interval_s": coordinator.poll_interval.total_seconds(),
+            "last_poll_duration_ms": (round(coordinator.last_poll_duration * 1000, 2)
+                                      if coordinator.last_poll_duration is not None else None),
+            "poll_duration": coordinator.poll_durations.as_dict(),
+        },
+        "commands": {
+            "generation": cdsp.generation,
+            "sent": cdsp.commands.sent,
+            "dropped": cdsp.commands.dropped,
+            "last_switch_duration_ms": (round(cdsp.last_switch_duration * 1000, 2)
+                                        if cdsp.last_switch_duration is not None else None),
+        },
+        "api": cdsp.metrics.as_dict(),
+        "health": cdsp.health.as_dict(),
+    }
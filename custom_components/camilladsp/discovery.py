@@ -0,0 +1,81 @@
+import asyncio
+import ipaddress
+import json
+import logging
+import re
+
+import aiohttp
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from .const import DEFAULT_DISCOVERY_PORT, DISCOVERY_MAX_HOSTS, DISCOVERY_PARALLEL, DISCOVERY_TIMEOUT
+
+LOGGER = logging.getLogger(__name__)
+
+
+class InvalidHosts(ValueError):
+    """The host list can't be parsed or is too large."""
+
+
+def parse_hosts(hosts: str, port: int = DEFAULT_DISCOVERY_PORT) -> list[str]:
+    """Expand a list of subnets, hosts and URLs to camillagui base URLs.
+
+    Items are separated by commas or whitespace, eg.
+    "192.168.1.0/24, dsp-kitchen:5005, http://10.0.0.5:5000".
+    """
+    urls: list[str] = []
+    for item in filter(None, re.split(r"[,\s]+", hosts.strip())):
+        if item.startswith(("http://", "https://")):
+            urls.append(item.rstrip("/"))
+        elif "/" in item:
+            try:
+                network = ipaddress.ip_network(item, strict=False)
+            except ValueError as err:
+                raise InvalidHosts(item) from err
+            if network.num_addresses > DISCOVERY_MAX_HOSTS:
+                raise InvalidHosts(item)
+            hostsOfNetwork = list(network.hosts()) or [network.network_address]
+            urls.extend(f"http://{_format_host(str(host))}:{port}" for host in hostsOfNetwork)
+        elif re.fullmatch(r"[^:\s]+:\d+", item):
+            urls.append(f"http://{item}")
+        else:
+            urls.append(f"http://{_format_host(item)}:{port}")
+
+        if len(urls) > DISCOVERY_MAX_HOSTS:
+            raise InvalidHosts(item)
+    return list(dict.fromkeys(urls))
+
+
+def _format_host(host: str) -> str:
+    return f"[{host}]" if ":" in host else host
+
+
+async def async_probe_url(hass: HomeAssistant, url: str, timeout: float = DISCOVERY_TIMEOUT) -> bool:
+    """Return True if a camillagui backend answers at url."""
+    session = async_get_clientsession(hass)
+    try:
+        async with session.get(f"{url}/api/status", timeout=aiohttp.ClientTimeout(total=timeout)) as res:
+            if res.status != 200:
+                return False
+            statusData = json.loads(await res.text())
+    except (aiohttp.ClientError, TimeoutError, ValueError, UnicodeDecodeError):
+        return False
+    return isinstance(statusData, dict) and "cdsp_status" in statusData
+
+
+async def async_discover(hass: HomeAssistant, urls: list[str]) -> list[str]:
+    """Probe all URLs concurrently, at most DISCOVERY_PARALLEL at a time.
+
+    Returns the URLs with a camillagui backend, in the given order.
+    """
+    semaphore = asyncio.Semaphore(DISCOVERY_PARALLEL)
+
+    async def probe(url: str) -> bool:
+        async with semaphore:
+            return await async_probe_url(hass, url)
+
+    results = await asyncio.gather(*(probe(url) for url in urls))
+    found = [url for url, ok in zip(urls, results) if ok]
+    LOGGER.debug(f"CamillaDSP discovery probed {len(urls)} URLs, found {len(found)}")
+    return found
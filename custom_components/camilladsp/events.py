@@ -0,0 +1,113 @@
+import asyncio
+import logging
+from typing import Any
+
+from homeassistant.components.media_player import MediaPlayerState
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+
+from .const import (
+    DOMAIN,
+    EVENT_CAPTURERATE_CHANGED,
+    EVENT_CLIPPING_DETECTED,
+    EVENT_CONFIG_CHANGED,
+    EVENT_STATE_CHANGED,
+)
+from .model import CDSPData
+
+LOGGER = logging.getLogger(__name__)
+
+# Fields of the snapshot that fire an event when they change. The capture
+# rate of the snapshot is the nominal rate, so measurement jitter doesn't
+# fire events.
+EVENT_FIELDS = {
+    "state": EVENT_STATE_CHANGED,
+    "capturerate": EVENT_CAPTURERATE_CHANGED,
+    "source": EVENT_CONFIG_CHANGED,
+}
+
+
+class CDSPEventDispatcher:
+    """Fire events for changes between consecutive snapshots of one instance.
+
+    A change is held back for the debounce delay. If the value returns to
+    the old one meanwhile, no event is fired, otherwise one event with the
+    old and the latest value. Clipped samples are summed over the delay.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str, delay: float) -> None:
+        self.hass = hass
+        self.entry_id = entry_id
+        self.delay = delay
+
+        self._settled: dict[str, Any] = {}
+        self._latest: dict[str, Any] = {}
+        self._timers: dict[str, asyncio.TimerHandle] = {}
+        self._clipped: int | None = None
+
+    @callback
+    def async_update(self, data: CDSPData) -> None:
+        for field in EVENT_FIELDS:
+            self._async_track(field, getattr(data, field))
+
+        clipped = data.status.clipped_samples
+        if clipped is None:
+            return
+        if self._clipped is None or clipped < self._clipped:
+            # First value, or the counter restarted with CamillaDSP.
+            self._clipped = clipped
+            self._async_cancel("clipped_samples")
+            return
+        self._latest["clipped_samples"] = clipped
+        if clipped > self._clipped and "clipped_samples" not in self._timers:
+            self._timers["clipped_samples"] = self.hass.loop.call_later(self.delay, self._async_fire_clipping)
+
+    @callback
+    def async_update_unreachable(self) -> None:
+        """Track a failed poll as state off, the other fields keep their value."""
+        self._async_track("state", MediaPlayerState.OFF)
+
+    @callback
+    def _async_track(self, field: str, value: Any) -> None:
+        if field not in self._settled:
+            self._settled[field] = value
+            return
+        self._latest[field] = value
+        if value == self._settled[field]:
+            # Flapped back before the event was fired.
+            self._async_cancel(field)
+        elif field not in self._timers:
+            self._timers[field] = self.hass.loop.call_later(self.delay, self._async_fire, field)
+
+    @callback
+    def _async_cancel(self, field: str) -> None:
+        if (timer := self._timers.pop(field, None)) is not None:
+            timer.cancel()
+
+    @callback
+    def _async_fire(self, field: str) -> None:
+        self._timers.pop(field, None)
+        old, new = self._settled[field], self._latest[field]
+        if old == new:
+            return
+        self._settled[field] = new
+        self._async_fire_event(EVENT_FIELDS[field], {"old": old, "new": new})
+
+    @callback
+    def _async_fire_clipping(self) -> None:
+        self._timers.pop("clipped_samples", None)
+        old, new = self._clipped, self._latest["clipped_samples"]
+        self._clipped = new
+        self._async_fire_event(EVENT_CLIPPING_DETECTED, {"old": old, "new": new, "clipped_samples": new - old})
+
+    @callback
+    def _async_fire_event(self, event_type: str, data: dict[str, Any]) -> None:
+        entity_id = er.async_get(self.hass).async_get_entity_id("media_player", DOMAIN, self.entry_id)
+        LOGGER.debug(f"CamillaDSP event {event_type} for {entity_id}: {data}")
+        self.hass.bus.async_fire(event_type, {"entity_id": entity_id, "entry_id": self.entry_id, **data})
+
+    @callback
+    def async_stop(self) -> None:
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
@@ -0,0 +1,144 @@
+import asyncio
+from collections.abc import Awaitable
+from datetime import timedelta
+import logging
+from typing import Any
+
+from homeassistant.components.media_player import MediaPlayerState
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+
+from .const import DOMAIN, FADER_VOLUME_MAX, FADER_VOLUME_MIN, GROUP_REFRESH_INTERVAL
+from .coordinator import CDSPDataUpdateCoordinator
+from .model import CDSPData
+
+LOGGER = logging.getLogger(__name__)
+
+
+class CDSPGroupCoordinator(DataUpdateCoordinator[CDSPData]):  # type: ignore[misc]
+    """Linked volume of several CamillaDSP instances.
+
+    The group state is derived from the cached data of the member
+    coordinators, without requests of its own. Commands are sent to all
+    members concurrently through their coordinators, with the dB offset of
+    each member added, and only to members whose value changes.
+    """
+
+    def __init__(self, hass: HomeAssistant, name: str, members: list[str], offsets: dict[str, float]) -> None:
+        # Members are followed through their listeners, the interval only
+        # picks up members that were set up after the group.
+        super().__init__(hass, LOGGER, name=f"{DOMAIN} group {name}",
+                         update_interval=timedelta(seconds=GROUP_REFRESH_INTERVAL), always_update=False)
+        self.members = members
+        self.offsets = offsets
+        self._unsubs: dict[CDSPDataUpdateCoordinator, CALLBACK_TYPE] = {}
+
+    async def _async_update_data(self) -> CDSPData:
+        return self._async_compute()
+
+    @callback
+    def _async_members(self) -> list[tuple[str, CDSPDataUpdateCoordinator]]:
+        """Return the members that are set up, and follow their updates."""
+        registry = er.async_get(self.hass)
+        coordinators: dict[str, CDSPDataUpdateCoordinator] = self.hass.data.get(DOMAIN, {})
+        members = []
+        for entity_id in self.members:
+            if (entry := registry.async_get(entity_id)) is None:
+                continue
+            if (coordinator := coordinators.get(entry.config_entry_id)) is not None:
+                members.append((entity_id, coordinator))
+
+        current = {coordinator for _, coordinator in members}
+        for coordinator in [coordinator for coordinator in self._unsubs if coordinator not in current]:
+            self._unsubs.pop(coordinator)()
+        for coordinator in current:
+            if coordinator not in self._unsubs:
+                self._unsubs[coordinator] = coordinator.async_add_listener(self._async_member_updated)
+        return members
+
+    @callback
+    def _async_member_updated(self) -> None:
+        data = self._async_compute()
+        if data != self.data:
+            self.async_set_updated_data(data)
+
+    @callback
+    def _async_compute(self) -> CDSPData:
+        members = [
+            (coordinator.data, self.offsets.get(entity_id, 0.0))
+            for entity_id, coordinator in self._async_members()
+            if coordinator.last_update_success and coordinator.data is not None
+            and coordinator.data.state != MediaPlayerState.OFF
+        ]
+        if not members:
+            return CDSPData(state=MediaPlayerState.OFF, volume=0, mute=False, source="",
+                            source_list=(), capturerate=0)
+
+        states = [data.state for data, _ in members]
+        sources = {data.source for data, _ in members}
+        first = members[0][0]
+        return CDSPData(
+            state=MediaPlayerState.PLAYING if MediaPlayerState.PLAYING in states else states[0],
+            # The master volume is the mean of the member volumes without their offsets.
+            volume=round(sum(data.volume - offset for data, offset in members) / len(members), 2),
+            mute=all(data.mute for data, _ in members),
+            source=first.source if len(sources) == 1 else "",
+            source_list=tuple(
+                source for source in first.source_list
+                if all(source in data.source_list for data, _ in members[1:])
+            ),
+            capturerate=first.capturerate,
+        )
+
+    def _target_volume(self, entity_id: str, volume: float) -> float:
+        return round(min(FADER_VOLUME_MAX, max(FADER_VOLUME_MIN, volume + self.offsets.get(entity_id, 0.0))), 2)
+
+    async def async_set_volume(self, volume: float) -> None:
+        writes = []
+        for entity_id, coordinator in self._async_members():
+            # Members that already have the volume get no request, but stop fading.
+            coordinator.async_cancel_fade()
+            target = self._target_volume(entity_id, volume)
+            if coordinator.data is None or coordinator.data.volume != target:
+                writes.append(coordinator.async_set_volume(target))
+        await self._async_dispatch(writes)
+
+    async def async_set_muted(self, muted: bool) -> None:
+        for _, coordinator in self._async_members():
+            coordinator.async_cancel_fade()
+        await self._async_dispatch([
+            coordinator.async_set_muted(muted)
+            for _, coordinator in self._async_members()
+            if coordinator.data is None or coordinator.data.mute != muted
+        ])
+
+    async def async_select_source(self, source: str) -> None:
+        await self._async_dispatch([
+            coordinator.async_select_source(source)
+            for _, coordinator in self._async_members()
+            if coordinator.data is None or coordinator.data.source != source
+        ])
+
+    async def async_fade_volume(self, volume: float, duration: float, curve: str) -> None:
+        await self._async_dispatch([
+            coordinator.async_fade_volume(self._target_volume(entity_id, volume), duration, curve)
+            for entity_id, coordinator in self._async_members()
+        ])
+
+    async def _async_dispatch(self, writes: list[Awaitable[Any]]) -> None:
+        """Run the member commands concurrently, fail only if all of them failed."""
+        if not writes:
+            return
+        results = await asyncio.gather(*writes, return_exceptions=True)
+        errors = [result for result in results if isinstance(result, Exception)]
+        for error in errors:
+            LOGGER.warning(f"CamillaDSP group command failed for a member: {error}")
+        if len(errors) == len(results):
+            raise errors[0]
+
+    async def async_shutdown(self) -> None:
+        for unsub in self._unsubs.values():
+            unsub()
+        self._unsubs.clear()
+        await super().async_shutdown()
@@ -0,0 +1,135 @@
+from array import array
+import math
+import time
+from typing import Any
+
+from .const import HEALTH_LOAD_BIN, HEALTH_WINDOWS
+
+
+class RollingWindow:
+    """Aggregates of the status values over a fixed time window.
+
+    The window is split into buckets stored in fixed-size arrays, one slot
+    per bucket. A slot is reset when time moved on to a new bucket, so
+    memory doesn't grow with the poll rate or the uptime.
+    """
+
+    __slots__ = ("bucket_seconds", "_size", "_bins", "_epochs", "_samples", "_load_max",
+                 "_load_hist", "_clipped", "_rate_changes", "_buffer_min")
+
+    def __init__(self, duration: float, buckets: int) -> None:
+        self.bucket_seconds = duration / buckets
+        self._size = buckets
+        self._bins = math.ceil(100 / HEALTH_LOAD_BIN) + 1
+        self._epochs = array("q", [-1] * buckets)
+        self._samples = array("L", bytes(array("L").itemsize * buckets))
+        self._load_max = array("d", bytes(8 * buckets))
+        # Processing load histogram per bucket, for percentiles over the window
+        self._load_hist = array("L", bytes(array("L").itemsize * buckets * self._bins))
+        self._clipped = array("L", bytes(array("L").itemsize * buckets))
+        self._rate_changes = array("L", bytes(array("L").itemsize * buckets))
+        self._buffer_min = array("d", [math.inf] * buckets)
+
+    def _slot(self, now: float) -> int:
+        epoch = int(now // self.bucket_seconds)
+        slot = epoch % self._size
+        if self._epochs[slot] != epoch:
+            self._epochs[slot] = epoch
+            self._samples[slot] = 0
+            self._load_max[slot] = 0
+            base = slot * self._bins
+            for index in range(base, base + self._bins):
+                self._load_hist[index] = 0
+            self._clipped[slot] = 0
+            self._rate_changes[slot] = 0
+            self._buffer_min[slot] = math.inf
+        return slot
+
+    def record(self, now: float, load: float | None, clipped: int, rate_changed: bool,
+               buffer_level: float | None) -> None:
+        slot = self._slot(now)
+        self._samples[slot] += 1
+        if load is not None:
+            load = min(max(load, 0.0), 100.0)
+            self._load_max[slot] = max(self._load_max[slot], load)
+            self._load_hist[slot * self._bins + int(load // HEALTH_LOAD_BIN)] += 1
+        self._clipped[slot] += clipped
+        if rate_changed:
+            self._rate_changes[slot] += 1
+        if buffer_level is not None:
+            self._buffer_min[slot] = min(self._buffer_min[slot], buffer_level)
+
+    def _valid_slots(self, now: float) -> list[int]:
+        epoch = int(now // self.bucket_seconds)
+        return [slot for slot in range(self._size) if epoch - self._size < self._epochs[slot] <= epoch]
+
+    def as_dict(self, now: float) -> dict[str, Any]:
+        slots = self._valid_slots(now)
+        samples = sum(self._samples[slot] for slot in slots)
+        hist = [0] * self._bins
+        for slot in slots:
+            base = slot * self._bins
+            for index in range(self._bins):
+                hist[index] += self._load_hist[base + index]
+        buffer_min = min((self._buffer_min[slot] for slot in slots), default=math.inf)
+        return {
+            "samples": samples,
+            "load_max": round(max((self._load_max[slot] for slot in slots), default=0), 1) if samples else None,
+            "load_p95": _percentile(hist, 0.95),
+            "clipped_samples": sum(self._clipped[slot] for slot in slots),
+            "capturerate_changes": sum(self._rate_changes[slot] for slot in slots),
+            "buffer_level_min": buffer_min if buffer_min != math.inf else None,
+        }
+
+
+def _percentile(hist: list[int], fraction: float) -> float | None:
+    """Upper bound of the load bin holding the given fraction of samples."""
+    count = sum(hist)
+    if count == 0:
+        return None
+    rank = fraction * count
+    seen = 0
+    for index, binCount in enumerate(hist):
+        seen += binCount
+        if seen >= rank:
+            return float(min(100, (index + 1) * HEALTH_LOAD_BIN))
+    return 100.0
+
+
+class CDSPHealthStats:
+    """Rolling health statistics of one CamillaDSP instance.
+
+    Fed with every polled status, kept for each window of HEALTH_WINDOWS.
+    """
+
+    def __init__(self) -> None:
+        self.windows = {
+            name: RollingWindow(duration, buckets) for name, (duration, buckets) in HEALTH_WINDOWS.items()
+        }
+        self._last_clipped: int | None = None
+        self._last_capturerate: int | None = None
+
+    def record(self, statusData: dict[str, Any], capturerate: int | None = None, now: float | None = None) -> None:
+        """Add a polled status, with the nominal capture rate of the client."""
+        now = time.monotonic() if now is None else now
+
+        clipped = 0
+        if (total := statusData.get("clippedsamples")) is not None:
+            if self._last_clipped is not None:
+                # The counter restarts with CamillaDSP.
+                clipped = total - self._last_clipped if total >= self._last_clipped else total
+            self._last_clipped = total
+
+        rate_changed = False
+        if capturerate:
+            # Only changes of the nominal rate count, the measured rate jitters.
+            rate_changed = self._last_capturerate is not None and capturerate != self._last_capturerate
+            self._last_capturerate = capturerate
+
+        for window in self.windows.values():
+            window.record(now, statusData.get("processingload"), clipped, rate_changed,
+                          statusData.get("bufferlevel"))
+
+    def as_dict(self, now: float | None = None) -> dict[str, dict[str, Any]]:
+        now = time.monotonic() if now is None else now
+        return {name: window.as_dict(now) for name, window in self.windows.items()}
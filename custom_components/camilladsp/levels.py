@@ -0,0 +1,172 @@
+from array import array
+import asyncio
+from collections.abc import Callable
+from dataclasses import dataclass
+import logging
+import math
+import time
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from .cdsp import CDSPClient
+from .const import DOMAIN, LEVEL_FLOOR_DB
+
+LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class LevelWindow:
+    """Aggregates of one level series over one publish window, in dB."""
+
+    min: float
+    max: float
+    mean: float
+    samples: int
+
+
+class LevelRingBuffer:
+    """Fixed-size ring buffer of dB samples backed by a C double array."""
+
+    __slots__ = ("_values", "_index", "_count")
+
+    def __init__(self, size: int) -> None:
+        self._values = array("d", bytes(8 * size))
+        self._index = 0
+        self._count = 0
+
+    def append(self, value: float) -> None:
+        self._values[self._index] = value
+        self._index = (self._index + 1) % len(self._values)
+        self._count = min(self._count + 1, len(self._values))
+
+    def clear(self) -> None:
+        self._index = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def window(self) -> LevelWindow | None:
+        """Reduce the buffered samples to min, max and power mean."""
+        if self._count == 0:
+            return None
+        values = self._values if self._count == len(self._values) else self._values[:self._count]
+        # Levels are dB values, so the mean is taken over power, not over dB.
+        power = sum(map(_db_to_power, values)) / self._count
+        return LevelWindow(
+            min=round(min(values), 1),
+            max=round(max(values), 1),
+            mean=round(_power_to_db(power), 1),
+            samples=self._count,
+        )
+
+
+def _db_to_power(value: float) -> float:
+    return 10 ** (value / 10)
+
+
+def _power_to_db(value: float) -> float:
+    if value <= 0:
+        return LEVEL_FLOOR_DB
+    return max(LEVEL_FLOOR_DB, 10 * math.log10(value))
+
+
+class LevelSampler:
+    """Sample signal levels of one CamillaDSP instance at a high rate.
+
+    Samples are kept in one ring buffer per level series. Listeners only get
+    the window aggregates, once per publish interval, sample listeners get
+    every sample. Sampling runs while at least one listener of either kind is
+    registered, one task per instance no matter how many there are.
+    """
+
+    def __init__(self, hass: HomeAssistant, cdsp: CDSPClient, sample_rate: float, window: float) -> None:
+        self.hass = hass
+        self.cdsp = cdsp
+        self.sample_interval = 1 / sample_rate
+        self.window = window
+
+        self._buffer_size = max(1, math.ceil(sample_rate * window))
+        self._buffers: dict[str, LevelRingBuffer] = {}
+        self._listeners: list[Callable[[dict[str, LevelWindow]], None]] = []
+        self._sample_listeners: list[Callable[[dict[str, list[float]]], None]] = []
+        self._task: asyncio.Task | None = None
+
+    @callback
+    def async_add_listener(self, update_callback: Callable[[dict[str, LevelWindow]], None]) -> CALLBACK_TYPE:
+        """Listen for window aggregates, start sampling if needed."""
+        return self._async_add(self._listeners, update_callback)
+
+    @callback
+    def async_add_sample_listener(self, sample_callback: Callable[[dict[str, list[float]]], None]) -> CALLBACK_TYPE:
+        """Listen for every sample, start sampling if needed."""
+        return self._async_add(self._sample_listeners, sample_callback)
+
+    @callback
+    def _async_add(self, listeners: list, listener: Callable) -> CALLBACK_TYPE:
+        listeners.append(listener)
+        if self._task is None:
+            self._task = self.hass.async_create_background_task(
+                self._async_run(), f"{DOMAIN} level sampler {self.cdsp.cdsp_id}"
+            )
+
+        @callback
+        def remove_listener() -> None:
+            listeners.remove(listener)
+            if not self._listeners and not self._sample_listeners:
+                self.async_stop()
+
+        return remove_listener
+
+    @callback
+    def async_stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._buffers.clear()
+
+    async def _async_run(self) -> None:
+        next_publish = time.monotonic() + self.window
+        while True:
+            if self.cdsp.breaker_open:
+                # CamillaDSP is unreachable, wait for the coordinator to probe it.
+                await asyncio.sleep(self.window)
+                continue
+            started = time.monotonic()
+            try:
+                levels = await self.cdsp.async_get_signal_levels()
+            except asyncio.CancelledError:
+                raise
+            except Exception as err:  # pylint: disable=broad-except
+                LOGGER.debug(f"CamillaDSP level sampling failed: {err}")
+            else:
+                self._add_samples(levels)
+                for sample_callback in list(self._sample_listeners):
+                    sample_callback(levels)
+
+            now = time.monotonic()
+            if now >= next_publish:
+                self._publish()
+                next_publish = now + self.window
+
+            await asyncio.sleep(max(0, self.sample_interval - (time.monotonic() - started)))
+
+    def _add_samples(self, levels: dict[str, list[float]]) -> None:
+        for series, values in levels.items():
+            for channel, value in enumerate(values):
+                key = f"{series}_{channel}"
+                if (buffer := self._buffers.get(key)) is None:
+                    buffer = self._buffers[key] = LevelRingBuffer(self._buffer_size)
+                buffer.append(max(LEVEL_FLOOR_DB, float(value)))
+
+    @callback
+    def _publish(self) -> None:
+        windows = {}
+        for key, buffer in self._buffers.items():
+            if (window := buffer.window()) is not None:
+                windows[key] = window
+            buffer.clear()
+        if not windows:
+            return
+        for update_callback in list(self._listeners):
+            update_callback(windows)
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
 import logging
+from typing import Any
 
 import voluptuous as vol
 
 from homeassistant.components.media_player import (
+    ATTR_GROUP_MEMBERS,
     MediaPlayerDeviceClass,
     MediaPlayerEntity,
     MediaPlayerEntityDescription,
@@ -14,22 +16,32 @@ from homeassistant.components.media_player import (
 )
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import ServiceValidationError
 from homeassistant.helpers import config_validation as cv, entity_platform
 from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from .const import (
     ATTR_CAPTURE_RATE,
+    ATTR_CURVE,
+    ATTR_DURATION,
+    ATTR_PATH,
+    ATTR_VALUE,
     ATTR_VOLUME_DB,
     CONFIG_VOLUME_MAX,
     CONFIG_VOLUME_MIN,
     CONFIG_VOLUME_STEP,
+    DATA_GROUPS,
     DOMAIN,
+    FADE_CURVES,
     NAME,
+    SERVICE_SET_CONFIG_VALUE,
     SERVICE_VOLUME_DB_SET,
+    SERVICE_VOLUME_FADE,
 )
 from .coordinator import CDSPDataUpdateCoordinator
 from .entity import CDSPEntity
+from .group import CDSPGroupCoordinator
 from .model import CDSPData
 
 LOGGER = logging.getLogger(__name__)
@@ -42,14 +54,17 @@ ENTITY_DESC = MediaPlayerEntityDescription(
 async def async_setup_entry(hass: HomeAssistant,
                             config_entry: ConfigEntry,
                             async_add_entities: AddEntitiesCallback) -> None:
-    coordinator = hass.data[DOMAIN][config_entry.entry_id]
-
     volume_min = config_entry.options.get(CONFIG_VOLUME_MIN)
     volume_max = config_entry.options.get(CONFIG_VOLUME_MAX)
     volume_step = config_entry.options.get(CONFIG_VOLUME_STEP)
 
     entities = []
-    entities.append(CDSPMediaPlayer(config_entry.entry_id, coordinator, ENTITY_DESC, volume_min, volume_max, volume_step))
+    if (group := hass.data.get(DATA_GROUPS, {}).get(config_entry.entry_id)) is not None:
+        entities.append(CDSPGroupMediaPlayer(config_entry.entry_id, config_entry.title, group, ENTITY_DESC,
+                                             volume_min, volume_max, volume_step))
+    else:
+        coordinator = hass.data[DOMAIN][config_entry.entry_id]
+        entities.append(CDSPMediaPlayer(config_entry.entry_id, coordinator, ENTITY_DESC, volume_min, volume_max, volume_step))
 
     async_add_entities(entities, update_before_add=False)
 
@@ -61,6 +76,23 @@ async def async_setup_entry(hass: HomeAssistant,
         },
         "async_set_volume_level_db",
     )
+    platform.async_register_entity_service(
+        SERVICE_VOLUME_FADE,
+        {
+            vol.Required(ATTR_VOLUME_DB): vol.Coerce(float),
+            vol.Required(ATTR_DURATION): vol.All(vol.Coerce(float), vol.Range(min=0, max=3600)),
+            vol.Optional(ATTR_CURVE, default="linear"): vol.In(list(FADE_CURVES)),
+        },
+        "async_volume_fade",
+    )
+    platform.async_register_entity_service(
+        SERVICE_SET_CONFIG_VALUE,
+        {
+            vol.Required(ATTR_PATH): cv.string,
+            vol.Required(ATTR_VALUE): vol.Any(vol.Coerce(float), cv.boolean, cv.string),
+        },
+        "async_set_config_value",
+    )
 
 
 class CDSPMediaPlayer(CDSPEntity, MediaPlayerEntity):  # type: ignore[misc]
@@ -76,6 +108,8 @@ class CDSPMediaPlayer(CDSPEntity, MediaPlayerEntity):  # type: ignore[misc]
         MediaPlayerEntityFeature.SELECT_SOURCE
     )
     _attr_source_list = []
+    # The capture rate changes with every source switch, keep it out of the recorder
+    _unrecorded_attributes = frozenset({ATTR_CAPTURE_RATE})
 
     entity_description = MediaPlayerEntityDescription
 
@@ -132,39 +166,40 @@ class CDSPMediaPlayer(CDSPEntity, MediaPlayerEntity):  # type: ignore[misc]
             self._attr_available = False
 
 
-    @callback
-    def _async_update_attrs_write_ha_state(self) -> None:
-        self._set_attrs_from_data()
-        self.async_write_ha_state()
-
+    @property
     def available(self) -> bool:
         """Return True if entity is available."""
-        return self._attr_available
+        return super().available and self._attr_available
 
     @property
     def extra_state_attributes(self):
         return self._extra_state_attributes
 
     async def async_set_volume_level(self, volume: float) -> None:
-        volumeDb = self._convertToDb(volume)
-        await self.coordinator.cdsp.async_set_volume(volumeDb)
-        self._data.volume = volumeDb
-        self._async_update_attrs_write_ha_state()
+        await self.coordinator.async_set_volume(self._convertToDb(volume))
 
     async def async_set_volume_level_db(self, volume_db: float) -> None:
-        await self.coordinator.cdsp.async_set_volume(volume_db)
-        self._data.volume = volume_db
-        self._async_update_attrs_write_ha_state()
+        await self.coordinator.async_set_volume(volume_db)
 
     async def async_mute_volume(self, mute: bool) -> None:
-        await self.coordinator.cdsp.async_set_muted(mute)
-        self._data.mute = mute
-        self._async_update_attrs_write_ha_state()
+        await self.coordinator.async_set_muted(mute)
+
+    async def async_volume_fade(self, volume_db: float, duration: float, curve: str = "linear") -> None:
+        """Start fading the volume in the background, replacing a running fade."""
+        await self.coordinator.async_fade_volume(volume_db, duration, curve)
 
     async def async_select_source(self, source: str) -> None:
-        await self.coordinator.cdsp.async_select_source(source)
-        self._data.source = source
-        self._async_update_attrs_write_ha_state()
+        await self.coordinator.async_select_source(source)
+
+    async def async_set_config_value(self, path: str, value: Any) -> None:
+        """Change one value of the running config, path like filters/peq_1/parameters/gain."""
+        if not isinstance(self.coordinator, CDSPDataUpdateCoordinator):
+            raise ServiceValidationError("Config values can't be set on a volume group")
+        keys = tuple(int(key) if key.isdigit() else key for key in path.strip("/").split("/"))
+        try:
+            await self.coordinator.async_set_config_value(keys, value)
+        except (KeyError, IndexError, TypeError, ValueError) as err:
+            raise ServiceValidationError(f"Invalid CamillaDSP config path {path}") from err
 
     def _convertToDb(self, volume: float) -> float:
         if isinstance(volume, (int,float)):
@@ -183,3 +218,21 @@ class CDSPMediaPlayer(CDSPEntity, MediaPlayerEntity):  # type: ignore[misc]
                 volume_step = 1
             return round(1 / (volRange / volume_step), 2)
         return 0
+
+
+class CDSPGroupMediaPlayer(CDSPMediaPlayer):
+    """Media player of a volume group, following the volume of its members."""
+
+    def __init__(
+        self,
+        unique_id: str,
+        name: str,
+        group: CDSPGroupCoordinator,
+        description: MediaPlayerEntityDescription,
+        volume_min: float,
+        volume_max: float,
+        volume_step
+    ) -> None:
+        super().__init__(unique_id, group, description, volume_min, volume_max, volume_step)
+        self._attr_device_info = DeviceInfo(identifiers={(DOMAIN, str(unique_id))}, name=name)
+        self._extra_state_attributes[ATTR_GROUP_MEMBERS] = list(group.members)
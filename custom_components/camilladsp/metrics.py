@@ -0,0 +1,103 @@
+from array import array
+from bisect import bisect_left
+from typing import Any
+
+# Upper bounds of the latency histogram buckets in ms, the last bucket is open
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class LatencyHistogram:
+    """Compact latency histogram with fixed buckets."""
+
+    __slots__ = ("_counts", "total", "count", "max")
+
+    def __init__(self) -> None:
+        self._counts = array("L", bytes(array("L").itemsize * (len(LATENCY_BUCKETS_MS) + 1)))
+        self.total: float = 0
+        self.count: int = 0
+        self.max: float = 0
+
+    def record(self, seconds: float) -> None:
+        ms = seconds * 1000
+        self._counts[bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+        self.total += ms
+        self.count += 1
+        if ms > self.max:
+            self.max = ms
+
+    def percentile(self, fraction: float) -> float | None:
+        """Upper bound of the bucket holding the given fraction of samples."""
+        if self.count == 0:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for index, bucketCount in enumerate(self._counts):
+            seen += bucketCount
+            if seen >= rank:
+                return float(LATENCY_BUCKETS_MS[index]) if index < len(LATENCY_BUCKETS_MS) else self.max
+        return self.max
+
+    def as_dict(self) -> dict[str, Any]:
+        buckets = {f"le_{bound}ms": count for bound, count in zip(LATENCY_BUCKETS_MS, self._counts)}
+        buckets[f"gt_{LATENCY_BUCKETS_MS[-1]}ms"] = self._counts[-1]
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count, 2) if self.count else None,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "max_ms": round(self.max, 2),
+            "buckets": buckets,
+        }
+
+
+class EndpointStats:
+    """Counters of one API endpoint."""
+
+    __slots__ = ("calls", "errors", "bytes_sent", "bytes_received", "latency")
+
+    def __init__(self) -> None:
+        self.calls: int = 0
+        self.errors: int = 0
+        self.bytes_sent: int = 0
+        self.bytes_received: int = 0
+        self.latency = LatencyHistogram()
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "latency": self.latency.as_dict(),
+        }
+
+
+class CDSPMetrics:
+    """Per-endpoint call statistics of one CamillaDSP client."""
+
+    def __init__(self) -> None:
+        self.endpoints: dict[str, EndpointStats] = {}
+        self.calls: int = 0
+        self.errors: int = 0
+
+    def record(self, endpoint: str, seconds: float, sent: int = 0, received: int = 0,
+               error: bool = False) -> None:
+        # Query strings would create an entry per config name.
+        key = endpoint.split("?", 1)[0]
+        if (stats := self.endpoints.get(key)) is None:
+            stats = self.endpoints[key] = EndpointStats()
+        stats.calls += 1
+        stats.bytes_sent += sent
+        stats.bytes_received += received
+        stats.latency.record(seconds)
+        self.calls += 1
+        if error:
+            stats.errors += 1
+            self.errors += 1
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "endpoints": {key: stats.as_dict() for key, stats in sorted(self.endpoints.items())},
+        }
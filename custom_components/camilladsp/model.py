@@ -1,12 +1,45 @@
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
+class CDSPFader:
+    """Volume (in dB) and mute state of one CamillaDSP fader."""
+
+    volume: float
+    mute: bool
+
+
+@dataclass(frozen=True, slots=True)
+class CDSPStatus:
+    """Processing status of CamillaDSP, None while not reported.
+
+    Values only change when they moved by more than their threshold, so
+    jitter doesn't produce a new snapshot.
+    """
+
+    processing_load: float | None = None
+    rate_adjust: float | None = None
+    buffer_level: int | None = None
+    clipped_samples: int | None = None
+
+
+@dataclass(frozen=True, slots=True)
 class CDSPData:
+    """Immutable snapshot of the CamillaDSP state.
+
+    Snapshots compare by value, so unchanged polls can be detected, and
+    source_list is a tuple that is reused as long as it doesn't change.
+    """
 
     state: str
     volume: float
     mute: bool
     source: str
-    source_list: list[str]
+    source_list: tuple[str, ...]
     capturerate: int
+    # All faders, the main fader first, empty if the backend doesn't provide them
+    faders: tuple[CDSPFader, ...] = ()
+    status: CDSPStatus = CDSPStatus()
+    # Hash of the active config as last read, so loading another config
+    # changes the snapshot although the config itself isn't part of it
+    config_revision: str = ""
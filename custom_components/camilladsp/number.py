@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import logging
+
+from homeassistant.components.number import NumberEntity, NumberMode
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .configs import ConfigParameter
+from .const import DOMAIN, FADER_VOLUME_MAX, FADER_VOLUME_MIN, NAME
+from .coordinator import CDSPDataUpdateCoordinator
+from .entity import CDSPEntity
+
+LOGGER = logging.getLogger(__name__)
+
+
+async def async_setup_entry(hass: HomeAssistant,
+                            config_entry: ConfigEntry,
+                            async_add_entities: AddEntitiesCallback) -> None:
+    coordinator: CDSPDataUpdateCoordinator = hass.data[DOMAIN][config_entry.entry_id]
+
+    # The main fader is controlled by the media player, aux faders get their
+    # own entities once the faders were read.
+    fader_count = 1
+
+    @callback
+    def _async_add_faders() -> None:
+        nonlocal fader_count
+        faders = coordinator.data.faders if coordinator.data is not None else ()
+        if len(faders) <= fader_count:
+            return
+        async_add_entities(
+            CDSPFaderVolume(config_entry.entry_id, coordinator, index) for index in range(fader_count, len(faders))
+        )
+        fader_count = len(faders)
+
+    _async_add_faders()
+    config_entry.async_on_unload(coordinator.async_add_listener(_async_add_faders))
+
+    known: set[tuple[str | int, ...]] = set()
+
+    # Config values are known once the active config was read, and change
+    # with it, so their entities are added when a value shows up.
+    @callback
+    def _async_add_config_numbers() -> None:
+        parameters = [parameter for parameter in coordinator.cdsp.config_parameters() if parameter.path not in known]
+        if not parameters:
+            return
+        known.update(parameter.path for parameter in parameters)
+        async_add_entities(
+            CDSPConfigNumber(config_entry.entry_id, coordinator, parameter) for parameter in parameters
+        )
+
+    _async_add_config_numbers()
+    config_entry.async_on_unload(coordinator.async_add_listener(_async_add_config_numbers))
+
+
+class CDSPFaderVolume(CDSPEntity, NumberEntity):  # type: ignore[misc]
+    """Volume of an aux fader in dB."""
+
+    _attr_has_entity_name = True
+    _attr_native_min_value = FADER_VOLUME_MIN
+    _attr_native_max_value = FADER_VOLUME_MAX
+    _attr_native_step = 0.5
+    _attr_native_unit_of_measurement = "dB"
+    _attr_mode = NumberMode.SLIDER
+
+    def __init__(self, unique_id: str, coordinator: CDSPDataUpdateCoordinator, index: int) -> None:
+        super().__init__(coordinator)
+        self._index = index
+        self._attr_name = f"Aux {index} volume"
+        self._attr_unique_id = f"{unique_id}_fader_{index}_volume"
+        self._attr_device_info = DeviceInfo(identifiers={(DOMAIN, str(unique_id))}, name=NAME)
+
+    @property
+    def available(self) -> bool:
+        return super().available and self.coordinator.data is not None and self._index < len(self.coordinator.data.faders)
+
+    @property
+    def native_value(self) -> float | None:
+        if not self.available:
+            return None
+        return self.coordinator.data.faders[self._index].volume
+
+    async def async_set_native_value(self, value: float) -> None:
+        await self.coordinator.async_set_fader_volume(self._index, value)
+
+
+class CDSPConfigNumber(CDSPEntity, NumberEntity):  # type: ignore[misc]
+    """Gain or level of a filter or mixer in the running config, in dB."""
+
+    _attr_has_entity_name = True
+    _attr_native_step = 0.1
+    _attr_native_unit_of_measurement = "dB"
+    _attr_mode = NumberMode.BOX
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(self, unique_id: str, coordinator: CDSPDataUpdateCoordinator, parameter: ConfigParameter) -> None:
+        super().__init__(coordinator)
+        self._path = parameter.path
+        self._attr_name = parameter.name
+        self._attr_native_min_value = parameter.min
+        self._attr_native_max_value = parameter.max
+        self._attr_unique_id = f"{unique_id}_config_{'_'.join(map(str, parameter.path))}"
+        self._attr_device_info = DeviceInfo(identifiers={(DOMAIN, str(unique_id))}, name=NAME)
+
+    @property
+    def available(self) -> bool:
+        # Values of another config are unavailable until it is active again.
+        return super().available and isinstance(self.coordinator.cdsp.config_value(self._path), (int, float))
+
+    @property
+    def native_value(self) -> float | None:
+        value = self.coordinator.cdsp.config_value(self._path)
+        return value if isinstance(value, (int, float)) else None
+
+    async def async_set_native_value(self, value: float) -> None:
+        await self.coordinator.async_set_config_value(self._path, value)
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING
+from urllib.parse import urlparse
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from .const import DOMAIN, MAX_POLLS_PER_HOST
+
+if TYPE_CHECKING:
+    from .coordinator import CDSPDataUpdateCoordinator
+
+LOGGER = logging.getLogger(__name__)
+
+
+class CDSPPollScheduler:
+    """Integration-wide scheduler for the polls of all CamillaDSP instances.
+
+    Every coordinator gets a phase within its poll interval, so instances
+    polling at the same interval are spread evenly instead of waking on the
+    same tick. Polls are grouped by host and the number of concurrent polls
+    per host is capped.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+        self._coordinators: list[CDSPDataUpdateCoordinator] = []
+        self._due: dict[CDSPDataUpdateCoordinator, float] = {}
+        self._hosts: dict[str, asyncio.Semaphore] = {}
+        self._running: set[CDSPDataUpdateCoordinator] = set()
+        self._timer: asyncio.TimerHandle | None = None
+
+    @callback
+    def async_register(self, coordinator: CDSPDataUpdateCoordinator) -> CALLBACK_TYPE:
+        """Take over polling of a coordinator."""
+        self._coordinators.append(coordinator)
+        coordinator.scheduler = self
+        coordinator.update_interval = None
+        self._async_schedule(coordinator)
+
+        @callback
+        def unregister() -> None:
+            self._coordinators.remove(coordinator)
+            self._due.pop(coordinator, None)
+            coordinator.scheduler = None
+            self._async_arm_timer()
+
+        return unregister
+
+    @callback
+    def async_reschedule(self, coordinator: CDSPDataUpdateCoordinator, delay: float | None = None) -> None:
+        """Schedule the next poll of a coordinator.
+
+        Without delay the poll is placed one poll interval ahead, aligned to
+        the phase of the coordinator.
+        """
+        if coordinator not in self._coordinators:
+            return
+        self._async_schedule(coordinator, delay)
+
+    @callback
+    def _async_schedule(self, coordinator: CDSPDataUpdateCoordinator, delay: float | None = None) -> None:
+        now = self.hass.loop.time()
+        if delay is not None:
+            due = now + delay
+        else:
+            interval = coordinator.poll_interval.total_seconds()
+            phase = self._coordinators.index(coordinator) / len(self._coordinators)
+            due = now + interval
+            # Move to the phase of this coordinator, by at most half an interval.
+            shift = (phase * interval - due) % interval
+            if shift > interval / 2:
+                shift -= interval
+            due += shift
+
+        current = self._due.get(coordinator)
+        if current is not None and delay is not None and current <= due:
+            return
+        self._due[coordinator] = due
+        self._async_arm_timer()
+
+    @callback
+    def _async_arm_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._due:
+            self._timer = self.hass.loop.call_at(min(self._due.values()), self._async_fire)
+
+    @callback
+    def _async_fire(self) -> None:
+        self._timer = None
+        now = self.hass.loop.time()
+        for coordinator, due in list(self._due.items()):
+            if due > now:
+                continue
+            self._due.pop(coordinator)
+            if coordinator in self._running:
+                continue
+            self._running.add(coordinator)
+            self.hass.async_create_background_task(
+                self._async_poll(coordinator), f"{DOMAIN} poll {coordinator.cdsp.cdsp_id}"
+            )
+        self._async_arm_timer()
+
+    async def _async_poll(self, coordinator: CDSPDataUpdateCoordinator) -> None:
+        host = urlparse(coordinator.cdsp.url).hostname or coordinator.cdsp.url
+        semaphore = self._hosts.setdefault(host, asyncio.Semaphore(MAX_POLLS_PER_HOST))
+        try:
+            async with semaphore:
+                await coordinator.async_refresh()
+        finally:
+            self._running.discard(coordinator)
+            if coordinator not in self._due:
+                self.async_reschedule(coordinator)
+
+    @callback
+    def async_shutdown(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._due.clear()
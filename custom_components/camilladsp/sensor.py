@@ -0,0 +1,284 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+import logging
+import time
+from typing import Any
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import PERCENTAGE, EntityCategory, UnitOfTime
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.typing import StateType
+
+from .const import (
+    CONFIG_LEVEL_SENSORS,
+    DEFAULT_LEVEL_SENSORS,
+    DOMAIN,
+    HEALTH_ATTRS_INTERVAL,
+    HEALTH_WINDOWS,
+    NAME,
+)
+from .coordinator import CDSPDataUpdateCoordinator
+from .entity import CDSPEntity
+from .levels import LevelSampler, LevelWindow
+
+LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, kw_only=True)
+class CDSPSensorEntityDescription(SensorEntityDescription):  # type: ignore[misc]
+    """Sensor description with a function reading the value from the coordinator."""
+
+    value_fn: Callable[[CDSPDataUpdateCoordinator], StateType]
+    attrs_fn: Callable[[CDSPDataUpdateCoordinator], dict[str, Any]] | None = None
+
+
+DIAGNOSTIC_SENSORS: tuple[CDSPSensorEntityDescription, ...] = (
+    CDSPSensorEntityDescription(
+        key="poll_duration",
+        translation_key="poll_duration",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=0,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda coordinator: (round(coordinator.last_poll_duration * 1000, 1)
+                                      if coordinator.last_poll_duration is not None else None),
+    ),
+    CDSPSensorEntityDescription(
+        key="api_requests",
+        translation_key="api_requests",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda coordinator: coordinator.cdsp.metrics.calls,
+    ),
+    CDSPSensorEntityDescription(
+        key="api_errors",
+        translation_key="api_errors",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda coordinator: coordinator.cdsp.metrics.errors,
+    ),
+    CDSPSensorEntityDescription(
+        key="commands_dropped",
+        translation_key="commands_dropped",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda coordinator: coordinator.cdsp.commands.dropped,
+    ),
+)
+
+
+def _status_value(field: str) -> Callable[[CDSPDataUpdateCoordinator], StateType]:
+    def value(coordinator: CDSPDataUpdateCoordinator) -> StateType:
+        if coordinator.data is None:
+            return None
+        return getattr(coordinator.data.status, field)
+
+    return value
+
+
+def _health_attrs(stats: dict[str, str]) -> Callable[[CDSPDataUpdateCoordinator], dict[str, Any]]:
+    """Rolling health statistics as attributes, eg. max_1h for stats {"load_max": "max"}."""
+    def attrs(coordinator: CDSPDataUpdateCoordinator) -> dict[str, Any]:
+        return {
+            f"{name}_{window}": values[stat]
+            for window, values in coordinator.cdsp.health.as_dict().items()
+            for stat, name in stats.items()
+        }
+
+    return attrs
+
+
+STATUS_SENSORS: tuple[CDSPSensorEntityDescription, ...] = (
+    CDSPSensorEntityDescription(
+        key="processing_load",
+        translation_key="processing_load",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=1,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=_status_value("processing_load"),
+        attrs_fn=_health_attrs({"load_max": "max", "load_p95": "p95"}),
+    ),
+    CDSPSensorEntityDescription(
+        key="rate_adjust",
+        translation_key="rate_adjust",
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=4,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=_status_value("rate_adjust"),
+        attrs_fn=_health_attrs({"capturerate_changes": "capturerate_changes"}),
+    ),
+    CDSPSensorEntityDescription(
+        key="buffer_level",
+        translation_key="buffer_level",
+        native_unit_of_measurement="frames",
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=_status_value("buffer_level"),
+        attrs_fn=_health_attrs({"buffer_level_min": "min"}),
+    ),
+    CDSPSensorEntityDescription(
+        key="clipped_samples",
+        translation_key="clipped_samples",
+        # The counter restarts with CamillaDSP.
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=_status_value("clipped_samples"),
+        attrs_fn=_health_attrs({"clipped_samples": "clipped"}),
+    ),
+)
+
+
+async def async_setup_entry(hass: HomeAssistant,
+                            config_entry: ConfigEntry,
+                            async_add_entities: AddEntitiesCallback) -> None:
+    coordinator: CDSPDataUpdateCoordinator = hass.data[DOMAIN][config_entry.entry_id]
+
+    async_add_entities(
+        CDSPSensor(config_entry.entry_id, coordinator, description)
+        for description in (*STATUS_SENSORS, *DIAGNOSTIC_SENSORS)
+    )
+
+    if config_entry.options.get(CONFIG_LEVEL_SENSORS, DEFAULT_LEVEL_SENSORS) and coordinator.levels is not None:
+        levels = coordinator.levels
+        known: set[str] = set()
+
+        # The number of channels is only known once levels were sampled, so
+        # level sensors are added when a series shows up for the first time.
+        @callback
+        def _async_add_level_sensors(windows: dict[str, LevelWindow]) -> None:
+            new_keys = [key for key in windows if key not in known]
+            if not new_keys:
+                return
+            known.update(new_keys)
+            async_add_entities(
+                [CDSPLevelSensor(config_entry.entry_id, levels, key, windows[key]) for key in new_keys]
+            )
+
+        config_entry.async_on_unload(levels.async_add_listener(_async_add_level_sensors))
+
+
+class CDSPSensor(CDSPEntity, SensorEntity):  # type: ignore[misc]
+    """Sensor with its value read from the coordinator."""
+
+    _attr_has_entity_name = True
+    # Rolling statistics are for a look at the current state, they aren't worth recording.
+    _unrecorded_attributes = frozenset(
+        f"{name}_{window}"
+        for window in HEALTH_WINDOWS
+        for name in ("max", "p95", "min", "clipped", "capturerate_changes")
+    )
+
+    entity_description: CDSPSensorEntityDescription
+
+    def __init__(
+        self,
+        unique_id: str,
+        coordinator: CDSPDataUpdateCoordinator,
+        description: CDSPSensorEntityDescription,
+    ) -> None:
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._attr_unique_id = f"{unique_id}_{description.key}"
+        self._attr_device_info = DeviceInfo(identifiers={(DOMAIN, str(unique_id))}, name=NAME)
+        self._attrs_updated: float | None = None
+        self._update_attrs()
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.async_on_remove(self.coordinator.async_add_poll_listener(self._handle_poll))
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        if self.entity_description.attrs_fn is None:
+            # Written by the poll listener, which also runs for changed snapshots.
+            return
+        self._update_attrs()
+        super()._handle_coordinator_update()
+
+    @callback
+    def _handle_poll(self) -> None:
+        if self.entity_description.attrs_fn is None:
+            # Metrics change with every poll, also when the snapshot didn't.
+            self.async_write_ha_state()
+            return
+        # The rolling statistics change as their buckets roll. Between
+        # snapshot changes they are refreshed at most once per
+        # HEALTH_ATTRS_INTERVAL, and only written if they changed.
+        if self._attrs_updated is not None and time.monotonic() - self._attrs_updated < HEALTH_ATTRS_INTERVAL:
+            return
+        attrs = self._attr_extra_state_attributes
+        self._update_attrs()
+        if self._attr_extra_state_attributes != attrs:
+            self.async_write_ha_state()
+
+    def _update_attrs(self) -> None:
+        if self.entity_description.attrs_fn is None:
+            return
+        self._attr_extra_state_attributes = self.entity_description.attrs_fn(self.coordinator)
+        self._attrs_updated = time.monotonic()
+
+    @property
+    def native_value(self) -> StateType:
+        return self.entity_description.value_fn(self.coordinator)
+
+
+class CDSPLevelSensor(SensorEntity):  # type: ignore[misc]
+    """Signal level of one channel, aggregated over the level window."""
+
+    _attr_has_entity_name = True
+    _attr_should_poll = False
+    _attr_native_unit_of_measurement = "dB"
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_suggested_display_precision = 1
+    _unrecorded_attributes = frozenset({"samples"})
+
+    def __init__(self, unique_id: str, levels: LevelSampler, key: str, window: LevelWindow) -> None:
+        side, kind, channel = key.split("_")
+        self.entity_description = SensorEntityDescription(key=key)
+        self._attr_name = f"{side.capitalize()} {kind.upper()} level {int(channel) + 1}"
+        self._attr_unique_id = f"{unique_id}_{key}"
+        self._attr_device_info = DeviceInfo(identifiers={(DOMAIN, str(unique_id))}, name=NAME)
+
+        self._levels = levels
+        self._key = key
+        self._peak = kind == "peak"
+        self._set_attrs_from_window(window)
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.async_on_remove(self._levels.async_add_listener(self._handle_windows))
+
+    @callback
+    def _handle_windows(self, windows: dict[str, LevelWindow]) -> None:
+        if (window := windows.get(self._key)) is None:
+            return
+        self._set_attrs_from_window(window)
+        self.async_write_ha_state()
+
+    def _set_attrs_from_window(self, window: LevelWindow) -> None:
+        # Peak sensors show the loudest sample of the window, RMS sensors the mean.
+        self._attr_native_value = window.max if self._peak else window.mean
+        self._attr_extra_state_attributes = {
+            "min": window.min,
+            "max": window.max,
+            "mean": window.mean,
+            "samples": window.samples,
+        }
+        if self._peak:
+            self._attr_extra_state_attributes["clipping"] = window.max >= 0
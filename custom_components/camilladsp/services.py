@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+import logging
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.const import (
+    ATTR_AREA_ID,
+    ATTR_DEVICE_ID,
+    ATTR_ENTITY_ID,
+    ATTR_FLOOR_ID,
+    ATTR_LABEL_ID,
+    ENTITY_MATCH_ALL,
+)
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv, entity_registry as er
+from homeassistant.helpers.service import async_extract_entity_ids
+
+from .const import (
+    ATTR_SNAPSHOT,
+    DATA_SNAPSHOTS,
+    DEFAULT_SNAPSHOT,
+    DOMAIN,
+    RESTORE_PARALLEL,
+    SERVICE_RESTORE,
+    SERVICE_SNAPSHOT,
+)
+from .coordinator import CDSPDataUpdateCoordinator
+from .model import CDSPFader
+
+LOGGER = logging.getLogger(__name__)
+
+# Service call fields that select a target
+TARGET_FIELDS = (ATTR_ENTITY_ID, ATTR_DEVICE_ID, ATTR_AREA_ID, ATTR_FLOOR_ID, ATTR_LABEL_ID)
+
+SNAPSHOT_SCHEMA = vol.Schema(
+    {
+        **cv.ENTITY_SERVICE_FIELDS,
+        vol.Optional(ATTR_SNAPSHOT, default=DEFAULT_SNAPSHOT): cv.string,
+    },
+    extra=vol.ALLOW_EXTRA,
+)
+
+
+@dataclass(frozen=True, slots=True)
+class CDSPSnapshot:
+    """Saved volume, mute, faders and config of one instance."""
+
+    volume: float
+    mute: bool
+    source: str
+    faders: tuple[CDSPFader, ...]
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration-wide services."""
+    if hass.services.has_service(DOMAIN, SERVICE_SNAPSHOT):
+        return
+
+    async def async_snapshot(call: ServiceCall) -> ServiceResponse:
+        snapshots = hass.data.setdefault(DATA_SNAPSHOTS, {})
+        saved: dict[str, CDSPSnapshot] = {}
+        # Only the cached coordinator data is used, no request is sent.
+        for entity_id, coordinator in (await _async_targets(hass, call)).items():
+            if (data := coordinator.data) is None or not coordinator.last_update_success:
+                continue
+            saved[entity_id] = CDSPSnapshot(volume=data.volume, mute=data.mute,
+                                            source=data.source, faders=data.faders)
+        snapshots[call.data[ATTR_SNAPSHOT]] = saved
+        return {
+            entity_id: {"volume": snapshot.volume, "mute": snapshot.mute, "source": snapshot.source}
+            for entity_id, snapshot in saved.items()
+        }
+
+    async def async_restore(call: ServiceCall) -> ServiceResponse:
+        name = call.data[ATTR_SNAPSHOT]
+        if (saved := hass.data.get(DATA_SNAPSHOTS, {}).get(name)) is None:
+            raise ServiceValidationError(f"No CamillaDSP snapshot named {name}")
+
+        # Without target, every instance saved in the snapshot is restored.
+        targets = await _async_targets(hass, call, saved)
+        semaphore = asyncio.Semaphore(RESTORE_PARALLEL)
+
+        async def restore(entity_id: str, coordinator: CDSPDataUpdateCoordinator) -> dict[str, Any]:
+            if (snapshot := saved.get(entity_id)) is None:
+                return {"result": "no_snapshot"}
+            async with semaphore:
+                try:
+                    changed = await _async_restore_instance(coordinator, snapshot)
+                except Exception as err:  # pylint: disable=broad-except
+                    LOGGER.warning(f"CamillaDSP restore of {entity_id} failed: {err}")
+                    return {"result": "error", "error": str(err)}
+            return {"result": "restored" if changed else "unchanged", "changed": changed}
+
+        results = await asyncio.gather(
+            *(restore(entity_id, coordinator) for entity_id, coordinator in targets.items())
+        )
+        return dict(zip(targets, results))
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_SNAPSHOT, async_snapshot, schema=SNAPSHOT_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_RESTORE, async_restore, schema=SNAPSHOT_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+
+async def _async_restore_instance(coordinator: CDSPDataUpdateCoordinator, snapshot: CDSPSnapshot) -> list[str]:
+    """Write only the values that differ from the cached state, return their names."""
+    data = coordinator.data
+    changed: list[str] = []
+
+    # Switching the config first, volume and faders are independent of it.
+    if data is None or data.source != snapshot.source:
+        await coordinator.async_select_source(snapshot.source)
+        changed.append("source")
+
+    writes = []
+    if data is None or data.volume != snapshot.volume:
+        writes.append(coordinator.async_set_volume(snapshot.volume))
+        changed.append("volume")
+    if data is None or data.mute != snapshot.mute:
+        writes.append(coordinator.async_set_muted(snapshot.mute))
+        changed.append("mute")
+    current = data.faders if data is not None else ()
+    for index, fader in enumerate(snapshot.faders[1:], start=1):
+        if index >= len(current):
+            break
+        if current[index].volume != fader.volume:
+            writes.append(coordinator.async_set_fader_volume(index, fader.volume))
+            changed.append(f"volume_{index}")
+        if current[index].mute != fader.mute:
+            writes.append(coordinator.async_set_fader_muted(index, fader.mute))
+            changed.append(f"mute_{index}")
+
+    await asyncio.gather(*writes)
+    return changed
+
+
+async def _async_targets(
+    hass: HomeAssistant, call: ServiceCall, entity_ids: Any = None
+) -> dict[str, CDSPDataUpdateCoordinator]:
+    """Map the targeted CamillaDSP media players to their coordinators.
+
+    Entities, devices, areas, floors and labels are resolved to media players.
+    Without target (or with entity_id all), the given entity ids or all
+    CamillaDSP media players are used.
+    """
+    if call.data.get(ATTR_ENTITY_ID) != ENTITY_MATCH_ALL and any(field in call.data for field in TARGET_FIELDS):
+        entity_ids = await async_extract_entity_ids(hass, call)
+
+    coordinators: dict[str, CDSPDataUpdateCoordinator] = hass.data.get(DOMAIN, {})
+    registry = er.async_get(hass)
+    targets = {}
+    for entry in registry.entities.values():
+        if entry.platform != DOMAIN or entry.domain != "media_player":
+            continue
+        if entity_ids is not None and entry.entity_id not in entity_ids:
+            continue
+        if (coordinator := coordinators.get(entry.config_entry_id)) is not None:
+            targets[entry.entity_id] = coordinator
+    return targets
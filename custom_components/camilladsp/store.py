@@ -0,0 +1,75 @@
+import logging
+from typing import Any
+
+from homeassistant.components.media_player import MediaPlayerState
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, STORAGE_SAVE_DELAY, STORAGE_VERSION
+from .model import CDSPData, CDSPFader
+
+LOGGER = logging.getLogger(__name__)
+
+
+class CDSPStateStore:
+    """Last known state of one CamillaDSP instance, kept across restarts.
+
+    Entities start from the stored state while the first poll runs in the
+    background. Only the restored fields are stored, and only written when
+    one of them changed, status values and the capture rate change too
+    often and are read again by the first poll.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        self._store: Store[dict[str, Any]] = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}")
+        self._saved: dict[str, Any] | None = None
+
+    async def async_load(self) -> CDSPData | None:
+        try:
+            stored = await self._store.async_load()
+        except Exception as err:  # pylint: disable=broad-except
+            LOGGER.debug(f"CamillaDSP stored state can't be loaded: {err}")
+            return None
+        if not stored:
+            return None
+        try:
+            data = CDSPData(
+                state=MediaPlayerState(stored["state"]),
+                volume=float(stored["volume"]),
+                mute=bool(stored["mute"]),
+                source=stored["source"],
+                source_list=tuple(stored["source_list"]),
+                capturerate=0,
+                faders=tuple(CDSPFader(volume=float(fader["volume"]), mute=bool(fader["mute"]))
+                             for fader in stored.get("faders", ())),
+            )
+        except (KeyError, TypeError, ValueError) as err:
+            LOGGER.debug(f"CamillaDSP stored state is invalid: {err!r}")
+            return None
+        self._saved = _stored_fields(data)
+        return data
+
+    @callback
+    def async_schedule_save(self, data: CDSPData | None) -> None:
+        """Save the state after STORAGE_SAVE_DELAY if a restored field changed."""
+        if data is None:
+            return
+        stored = _stored_fields(data)
+        if stored == self._saved:
+            return
+        self._saved = stored
+        self._store.async_delay_save(lambda: stored, STORAGE_SAVE_DELAY)
+
+    async def async_remove(self) -> None:
+        await self._store.async_remove()
+
+
+def _stored_fields(data: CDSPData) -> dict[str, Any]:
+    return {
+        "state": str(data.state),
+        "volume": data.volume,
+        "mute": data.mute,
+        "source": data.source,
+        "source_list": list(data.source_list),
+        "faders": [{"volume": fader.volume, "mute": fader.mute} for fader in data.faders],
+    }
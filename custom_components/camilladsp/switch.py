@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from homeassistant.components.switch import SwitchEntity
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import DOMAIN, NAME
+from .coordinator import CDSPDataUpdateCoordinator
+from .entity import CDSPEntity
+
+LOGGER = logging.getLogger(__name__)
+
+
+async def async_setup_entry(hass: HomeAssistant,
+                            config_entry: ConfigEntry,
+                            async_add_entities: AddEntitiesCallback) -> None:
+    coordinator: CDSPDataUpdateCoordinator = hass.data[DOMAIN][config_entry.entry_id]
+
+    # The main fader is controlled by the media player, aux faders get their
+    # own entities once the faders were read.
+    fader_count = 1
+
+    @callback
+    def _async_add_faders() -> None:
+        nonlocal fader_count
+        faders = coordinator.data.faders if coordinator.data is not None else ()
+        if len(faders) <= fader_count:
+            return
+        async_add_entities(
+            CDSPFaderMute(config_entry.entry_id, coordinator, index) for index in range(fader_count, len(faders))
+        )
+        fader_count = len(faders)
+
+    _async_add_faders()
+    config_entry.async_on_unload(coordinator.async_add_listener(_async_add_faders))
+
+
+class CDSPFaderMute(CDSPEntity, SwitchEntity):  # type: ignore[misc]
+    """Mute of an aux fader, on while muted."""
+
+    _attr_has_entity_name = True
+    _attr_icon = "mdi:volume-off"
+
+    def __init__(self, unique_id: str, coordinator: CDSPDataUpdateCoordinator, index: int) -> None:
+        super().__init__(coordinator)
+        self._index = index
+        self._attr_name = f"Aux {index} mute"
+        self._attr_unique_id = f"{unique_id}_fader_{index}_mute"
+        self._attr_device_info = DeviceInfo(identifiers={(DOMAIN, str(unique_id))}, name=NAME)
+
+    @property
+    def available(self) -> bool:
+        return super().available and self.coordinator.data is not None and self._index < len(self.coordinator.data.faders)
+
+    @property
+    def is_on(self) -> bool | None:
+        if not self.available:
+            return None
+        return self.coordinator.data.faders[self._index].mute
+
+    async def async_turn_on(self, **kwargs: Any) -> None:
+        await self.coordinator.async_set_fader_muted(self._index, True)
+
+    async def async_turn_off(self, **kwargs: Any) -> None:
+        await self.coordinator.async_set_fader_muted(self._index, False)
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import config_validation as cv, entity_registry as er
+
+from .const import DOMAIN, LEVEL_FLOOR_DB, LEVEL_STREAM_DEFAULT_RATE, LEVEL_STREAM_MAX_RATE
+from .coordinator import CDSPDataUpdateCoordinator
+
+
+@callback
+def async_setup_websocket_api(hass: HomeAssistant) -> None:
+    """Register the websocket commands of the integration."""
+    websocket_api.async_register_command(hass, ws_subscribe_levels)
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): f"{DOMAIN}/subscribe_levels",
+        vol.Required("entity_id"): cv.entity_id,
+        vol.Optional("max_rate", default=LEVEL_STREAM_DEFAULT_RATE): vol.All(
+            vol.Coerce(float), vol.Range(min=0.1, max=LEVEL_STREAM_MAX_RATE)
+        ),
+    }
+)
+@callback
+def ws_subscribe_levels(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict[str, Any]
+) -> None:
+    """Stream the signal levels of one CamillaDSP instance.
+
+    All subscribers of an instance share its level sampler. Each subscriber
+    gets at most max_rate messages per second, samples in between are
+    coalesced and only the latest one is sent.
+    """
+    coordinator = _async_coordinator(hass, msg["entity_id"])
+    if coordinator is None or coordinator.levels is None:
+        connection.send_error(msg["id"], websocket_api.ERR_NOT_FOUND, "CamillaDSP entity not found")
+        return
+
+    loop = hass.loop
+    min_interval = 1 / msg["max_rate"]
+    last_sent = -min_interval
+    pending: dict[str, list[float]] | None = None
+    flush_handle: asyncio.TimerHandle | None = None
+
+    @callback
+    def flush() -> None:
+        nonlocal last_sent, pending, flush_handle
+        flush_handle = None
+        if pending is None:
+            return
+        last_sent = loop.time()
+        connection.send_message(websocket_api.event_message(msg["id"], {"levels": pending}))
+        pending = None
+
+    @callback
+    def forward(levels: dict[str, list[float]]) -> None:
+        nonlocal pending, flush_handle
+        pending = {
+            series: [round(max(LEVEL_FLOOR_DB, float(value)), 1) for value in values]
+            for series, values in levels.items()
+        }
+        if flush_handle is None:
+            flush_handle = loop.call_at(max(loop.time(), last_sent + min_interval), flush)
+
+    remove_listener = coordinator.levels.async_add_sample_listener(forward)
+
+    @callback
+    def unsubscribe() -> None:
+        if flush_handle is not None:
+            flush_handle.cancel()
+        remove_listener()
+
+    connection.subscriptions[msg["id"]] = unsubscribe
+    connection.send_result(msg["id"])
+
+
+@callback
+def _async_coordinator(hass: HomeAssistant, entity_id: str) -> CDSPDataUpdateCoordinator | None:
+    entry = er.async_get(hass).async_get(entity_id)
+    if entry is None or entry.platform != DOMAIN:
+        return None
+    return hass.data.get(DOMAIN, {}).get(entry.config_entry_id)
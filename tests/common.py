@@ -0,0 +1,45 @@
+"""Helpers for the CamillaDSP tests."""
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from pytest_homeassistant_custom_component.test_util.aiohttp import AiohttpClientMocker
+
+from custom_components.camilladsp.const import (
+    CONFIG_TRANSPORT,
+    CONFIG_URL,
+    CONFIG_VOLUME_MAX,
+    CONFIG_VOLUME_MIN,
+    CONFIG_VOLUME_STEP,
+    DOMAIN,
+    TRANSPORT_HTTP,
+)
+
+URL = "http://camilladsp.local:5005"
+
+
+def mock_camillagui(
+    aioclient_mock: AiohttpClientMocker, name: str = "a.yml", gain: float = -3.0, load: float = 20.0
+) -> None:
+    """Answer the camillagui requests with a running config with one filter gain."""
+    aioclient_mock.clear_requests()
+    config = {"filters": {"peq": {"type": "Biquad", "parameters": {"type": "Peaking", "gain": gain}}}}
+    aioclient_mock.get(f"{URL}/api/status",
+                       json={"cdsp_status": "RUNNING", "capturerate": 48000, "processingload": load})
+    aioclient_mock.get(f"{URL}/api/getlistparam/faders", json=[{"volume": -20.0, "mute": False}])
+    aioclient_mock.get(f"{URL}/api/getactiveconfigfile", json={"configFileName": name, "config": config})
+    aioclient_mock.get(f"{URL}/api/storedconfigs", json=[{"name": "a.yml"}, {"name": "b.yml"}])
+    aioclient_mock.get(f"{URL}/api/getconfigfile", status=404)
+    aioclient_mock.post(f"{URL}/api/setactiveconfigfile", text="OK")
+    aioclient_mock.post(f"{URL}/api/setconfig", text="OK")
+
+
+async def async_setup_instance(hass: HomeAssistant) -> MockConfigEntry:
+    """Set up a CamillaDSP instance talking to the mocked camillagui."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONFIG_URL: URL, CONFIG_TRANSPORT: TRANSPORT_HTTP},
+        options={CONFIG_VOLUME_MIN: -50.0, CONFIG_VOLUME_MAX: 0.0, CONFIG_VOLUME_STEP: 1.0},
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    return entry
@@ -0,0 +1,214 @@
+"""Tests for the CamillaDSP client."""
+import asyncio
+import json
+from unittest.mock import AsyncMock
+
+from homeassistant.core import HomeAssistant
+import pytest
+
+from custom_components.camilladsp.cdsp import ApiError, CDSPClient, UnsupportedError
+from custom_components.camilladsp.commands import CDSPCommandQueue
+
+FADERS = [{"volume": -20.0, "mute": False}, {"volume": -6.0, "mute": True}]
+
+
+def _client(hass: HomeAssistant, *replies) -> CDSPClient:
+    cdsp = CDSPClient(hass, "http://camilladsp.local:5005")
+    cdsp._api.async_get = AsyncMock(side_effect=replies)
+    return cdsp
+
+
+async def test_faders_unsupported_after_not_found(hass: HomeAssistant) -> None:
+    """A not found reply falls back to reading main volume and mute for good."""
+    cdsp = _client(hass, UnsupportedError("404"), "-20.0", "False", "-21.0", "True")
+
+    assert await cdsp._async_read_faders() == {"volume": -20.0, "mute": False}
+    assert await cdsp._async_read_faders() == {"volume": -21.0, "mute": True}
+    assert cdsp._faders_supported is False
+
+
+async def test_faders_retried_after_transient_error(hass: HomeAssistant) -> None:
+    """A failed first read, eg. while CamillaDSP starts, doesn't disable the faders."""
+    cdsp = _client(hass, ApiError("timeout"), json.dumps(FADERS))
+
+    with pytest.raises(ApiError):
+        await cdsp._async_read_faders()
+    assert cdsp._faders_supported is None
+
+    assert await cdsp._async_read_faders() == {
+        "volume": -20.0, "mute": False, "volume_1": -6.0, "mute_1": True,
+    }
+    assert cdsp._faders_supported is True
+
+
+async def test_http_not_found_is_unsupported(hass: HomeAssistant, aioclient_mock) -> None:
+    """Only a 404 of camillagui tells that an endpoint is not supported."""
+    url = "http://camilladsp.local:5005"
+    aioclient_mock.get(f"{url}/api/getlistparam/faders", status=404)
+    aioclient_mock.get(f"{url}/api/getparam/volume", status=500)
+    cdsp = CDSPClient(hass, url)
+
+    with pytest.raises(UnsupportedError):
+        await cdsp._api.async_get("getlistparam/faders")
+    with pytest.raises(ApiError) as err:
+        await cdsp._api.async_get("getparam/volume")
+    assert not isinstance(err.value, UnsupportedError)
+
+
+
+async def test_capturerate_jitter_keeps_snapshot(hass: HomeAssistant) -> None:
+    """Measured capture rates drifting by a few Hz give equal snapshots."""
+    def status(rate: float) -> str:
+        return json.dumps({"cdsp_status": "RUNNING", "capturerate": rate})
+
+    faders = json.dumps(FADERS)
+    configs = (json.dumps({"configFileName": "a.yml", "config": {}}), "[]")
+    cdsp = _client(hass, status(48003.2), faders, *configs, status(47996.8), faders)
+
+    first = await cdsp.update()
+    assert first.capturerate == 48000
+    assert await cdsp.update() == first
+
+
+def test_nominal_capturerate(hass: HomeAssistant) -> None:
+    """Rates close to a standard rate snap to it, others follow larger moves only."""
+    cdsp = CDSPClient(hass, "http://camilladsp.local:5005")
+    assert cdsp._nominal_capturerate(44107.5) == 44100
+    assert cdsp._nominal_capturerate(None) == 0
+    assert cdsp._nominal_capturerate(60000) == 60000
+    assert cdsp._nominal_capturerate(60010) == 60000
+    assert cdsp._nominal_capturerate(66000) == 66000
+
+
+async def test_partial_source_switch_reads_config_next_poll(hass: HomeAssistant) -> None:
+    """A switch with one failed request names it, and the next poll reads the active config."""
+    active = json.dumps({"configFileName": "a.yml", "config": {}})
+    cdsp = _client(hass, json.dumps({"cdsp_status": "RUNNING", "capturerate": 48000}),
+                   json.dumps(FADERS), active, "[]")
+    cdsp._update_configs(active, "[]")
+    cdsp.configs.add("b.yml", {})
+
+    async def post(endpoint: str, data: str) -> str:
+        if endpoint == "setconfig":
+            raise ApiError("timeout")
+        return "OK"
+
+    cdsp._api.async_post = AsyncMock(side_effect=post)
+    with pytest.raises(ApiError, match="failed in setconfig, succeeded: setactiveconfigfile"):
+        await cdsp.async_select_source("b.yml")
+
+    data = await cdsp.update()
+    assert data.source == "a.yml"
+    assert [call.args[0] for call in cdsp._api.async_get.await_args_list] == [
+        "status", "getlistparam/faders", "getactiveconfigfile", "storedconfigs",
+    ]
+
+
+async def test_command_queue_latest_wins(hass: HomeAssistant) -> None:
+    """Values queued behind an in-flight write are coalesced to the newest one."""
+    queue = CDSPCommandQueue(hass)
+    release = asyncio.Event()
+    written = []
+
+    async def write(value: float) -> None:
+        written.append(value)
+        await release.wait()
+
+    first = asyncio.create_task(queue.async_submit("volume", -30.0, write))
+    await asyncio.sleep(0)
+    superseded = asyncio.create_task(queue.async_submit("volume", -25.0, write))
+    latest = asyncio.create_task(queue.async_submit("volume", -20.0, write))
+    await asyncio.sleep(0)
+    assert written == [-30.0]
+
+    release.set()
+    await asyncio.gather(first, superseded, latest)
+    assert written == [-30.0, -20.0]
+    assert (queue.sent, queue.dropped) == (2, 1)
+
+
+async def test_command_queue_releases_superseded_after_newer_write(hass: HomeAssistant) -> None:
+    """A superseded caller waits until the newer value was written."""
+    queue = CDSPCommandQueue(hass)
+    gates = {-30.0: asyncio.Event(), -20.0: asyncio.Event()}
+
+    async def write(value: float) -> None:
+        await gates[value].wait()
+
+    first = asyncio.create_task(queue.async_submit("volume", -30.0, write))
+    await asyncio.sleep(0)
+    superseded = asyncio.create_task(queue.async_submit("volume", -25.0, write))
+    latest = asyncio.create_task(queue.async_submit("volume", -20.0, write))
+    gates[-30.0].set()
+    await first
+    await asyncio.sleep(0)
+    assert not superseded.done()
+
+    gates[-20.0].set()
+    await asyncio.gather(superseded, latest)
+
+
+async def test_command_queue_error_reaches_coalesced_callers(hass: HomeAssistant) -> None:
+    """A failed write fails every caller whose value it carried, other keys are unaffected."""
+    queue = CDSPCommandQueue(hass)
+    release = asyncio.Event()
+
+    async def write(value: float) -> None:
+        await release.wait()
+        if value == -20.0:
+            raise ApiError("timeout")
+
+    first = asyncio.create_task(queue.async_submit("volume", -30.0, write))
+    await asyncio.sleep(0)
+    coalesced = [asyncio.create_task(queue.async_submit("volume", value, write)) for value in (-25.0, -20.0)]
+    mute = asyncio.create_task(queue.async_submit("mute", True, write))
+    release.set()
+
+    await first
+    await mute
+    for task in coalesced:
+        with pytest.raises(ApiError):
+            await task
+
+
+async def test_poll_keeps_command_acknowledged_during_poll(hass: HomeAssistant) -> None:
+    """A poll that started before a write was acknowledged doesn't revert its value."""
+    cdsp = CDSPClient(hass, "http://camilladsp.local:5005")
+    cdsp._update_configs(json.dumps({"configFileName": "a.yml", "config": {}}), "[]")
+    cdsp._api.async_post = AsyncMock(return_value="OK")
+    poll_sent = asyncio.Event()
+    release = asyncio.Event()
+
+    async def get(endpoint: str) -> str:
+        if endpoint == "status":
+            return json.dumps({"cdsp_status": "RUNNING", "capturerate": 48000})
+        poll_sent.set()
+        await release.wait()
+        return json.dumps([{"volume": -30.0, "mute": False}])
+
+    cdsp._api.async_get = AsyncMock(side_effect=get)
+
+    # The poll reads the old volume while the write is in flight.
+    poll = asyncio.create_task(cdsp.update())
+    await poll_sent.wait()
+    await cdsp.async_set_volume(-20.0)
+    release.set()
+    assert (await poll).volume == -20.0
+
+    # Polls started after the acknowledgement are trusted again.
+    assert (await cdsp.update()).volume == -30.0
+    assert "volume" not in cdsp._optimistic
+
+
+async def test_failed_command_falls_back_to_polled_value(hass: HomeAssistant) -> None:
+    """The optimistic value of a failed write is dropped, only written fields are confirmed."""
+    cdsp = CDSPClient(hass, "http://camilladsp.local:5005")
+    cdsp._api.async_post = AsyncMock(side_effect=ApiError("timeout"))
+
+    with pytest.raises(ApiError):
+        await cdsp.async_set_muted(True)
+    assert cdsp._reconcile({"mute": False}, dict(cdsp._acked)) == {"mute": False}
+
+    cdsp._api.async_get = AsyncMock(return_value="False")
+    assert await cdsp.async_confirm() == {"mute": False}
+    assert [call.args[0] for call in cdsp._api.async_get.await_args_list] == ["getparam/mute"]
@@ -0,0 +1,71 @@
+"""Tests for the CamillaDSP config and options flows."""
+from homeassistant.core import HomeAssistant
+from homeassistant.data_entry_flow import FlowResultType
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.camilladsp.const import (
+    CONFIG_GROUP_MEMBERS,
+    CONFIG_GROUP_OFFSETS,
+    CONFIG_VOLUME_MAX,
+    CONFIG_VOLUME_MIN,
+    CONFIG_VOLUME_STEP,
+    DOMAIN,
+)
+
+MEMBERS = ["media_player.kitchen", "media_player.living_room"]
+
+
+def _group_entry(hass: HomeAssistant) -> MockConfigEntry:
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="Downstairs",
+        data={CONFIG_GROUP_MEMBERS: MEMBERS},
+        options={
+            CONFIG_VOLUME_MIN: -50.0,
+            CONFIG_VOLUME_MAX: 0.0,
+            CONFIG_VOLUME_STEP: 1.0,
+            CONFIG_GROUP_OFFSETS: {MEMBERS[0]: 0.0, MEMBERS[1]: -3.0},
+        },
+    )
+    entry.add_to_hass(hass)
+    return entry
+
+
+async def test_group_options_flow(hass: HomeAssistant) -> None:
+    """The options of a group change its volume range and member offsets."""
+    entry = _group_entry(hass)
+
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    assert result["type"] is FlowResultType.FORM
+    assert result["step_id"] == "group"
+
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"],
+        user_input={
+            CONFIG_VOLUME_MIN: -60.0,
+            CONFIG_VOLUME_MAX: -5.0,
+            CONFIG_VOLUME_STEP: 2.0,
+            MEMBERS[0]: 1.5,
+            MEMBERS[1]: -6.0,
+        },
+    )
+    assert result["type"] is FlowResultType.CREATE_ENTRY
+    assert entry.options == {
+        CONFIG_VOLUME_MIN: -60.0,
+        CONFIG_VOLUME_MAX: -5.0,
+        CONFIG_VOLUME_STEP: 2.0,
+        CONFIG_GROUP_OFFSETS: {MEMBERS[0]: 1.5, MEMBERS[1]: -6.0},
+    }
+
+
+async def test_group_options_flow_invalid_range(hass: HomeAssistant) -> None:
+    """A volume range with min above max is rejected."""
+    entry = _group_entry(hass)
+
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"],
+        user_input={CONFIG_VOLUME_MIN: -5.0, CONFIG_VOLUME_MAX: -10.0, CONFIG_VOLUME_STEP: 1.0},
+    )
+    assert result["type"] is FlowResultType.FORM
+    assert result["errors"] == {"base": "invalid_value"}
@@ -0,0 +1,113 @@
+"""Tests for the CamillaDSP update coordinator."""
+import asyncio
+from datetime import timedelta
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import async_capture_events
+
+from custom_components.camilladsp.cdsp import ApiError, CDSPClient
+from custom_components.camilladsp.const import EVENT_CAPTURERATE_CHANGED, EVENT_STATE_CHANGED
+from custom_components.camilladsp.coordinator import CDSPDataUpdateCoordinator
+from custom_components.camilladsp.events import CDSPEventDispatcher
+from custom_components.camilladsp.model import CDSPData
+
+DATA = CDSPData(state="playing", volume=-20.0, mute=False, source="a.yml",
+                source_list=("a.yml",), capturerate=48000)
+
+
+def _coordinator(hass: HomeAssistant) -> CDSPDataUpdateCoordinator:
+    cdsp = MagicMock()
+    cdsp.update = AsyncMock(return_value=DATA)
+    return CDSPDataUpdateCoordinator(hass, cdsp, timedelta(seconds=10))
+
+
+async def test_poll_listeners_run_for_unchanged_snapshots(hass: HomeAssistant) -> None:
+    """Snapshot listeners skip equal polls, poll listeners run after every poll."""
+    coordinator = _coordinator(hass)
+    snapshot_updates = []
+    poll_updates = []
+    coordinator.async_add_listener(lambda: snapshot_updates.append(coordinator.data))
+    remove = coordinator.async_add_poll_listener(lambda: poll_updates.append(coordinator.data))
+
+    await coordinator.async_refresh()
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert snapshot_updates == [DATA]
+    assert poll_updates == [DATA, DATA]
+
+    coordinator.cdsp.update.side_effect = ApiError("unreachable")
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert len(poll_updates) == 3
+
+    remove()
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert len(poll_updates) == 3
+    await coordinator.async_shutdown()
+
+
+async def test_volume_command_cancels_fade(hass: HomeAssistant) -> None:
+    """A volume write from any caller stops a running fade."""
+    coordinator = _coordinator(hass)
+    coordinator.cdsp.volume_ramp_time = None
+    coordinator.cdsp.async_set_volume = AsyncMock()
+    await coordinator.async_refresh()
+
+    await coordinator.async_fade_volume(-40.0, 10, "linear")
+    await asyncio.sleep(0)
+    assert coordinator.cdsp.async_set_volume.await_count == 1
+
+    await coordinator.async_set_volume(-30.0)
+    await asyncio.sleep(0.3)
+    assert coordinator.cdsp.async_set_volume.await_args_list[-1].args == (-30.0,)
+    assert coordinator.cdsp.async_set_volume.await_count == 2
+    await coordinator.async_shutdown()
+
+
+async def test_state_event_when_unreachable(hass: HomeAssistant) -> None:
+    """Failed polls fire a state change to off, and back once reachable again."""
+    coordinator = _coordinator(hass)
+    coordinator.events = CDSPEventDispatcher(hass, "entry", 0.01)
+    events = async_capture_events(hass, EVENT_STATE_CHANGED)
+
+    await coordinator.async_refresh()
+    coordinator.cdsp.update.side_effect = ApiError("unreachable")
+    await coordinator.async_refresh()
+    await asyncio.sleep(0.02)
+    coordinator.cdsp.update.side_effect = None
+    await coordinator.async_refresh()
+    await asyncio.sleep(0.02)
+
+    assert [(event.data["old"], event.data["new"]) for event in events] == [
+        ("playing", "off"), ("off", "playing"),
+    ]
+    await coordinator.async_shutdown()
+
+
+async def test_capturerate_event_ignores_jitter(hass: HomeAssistant) -> None:
+    """Only a change of the nominal capture rate fires an event."""
+    cdsp = CDSPClient(hass, "http://camilladsp.local:5005")
+    faders = json.dumps([{"volume": -20.0, "mute": False}])
+    configs = (json.dumps({"configFileName": "a.yml", "config": {}}), "[]")
+    replies = [json.dumps({"cdsp_status": "RUNNING", "capturerate": rate})
+               for rate in (48003.2, 47996.8, 48001.5, 44097.0)]
+    cdsp._api.async_get = AsyncMock(side_effect=[
+        replies[0], faders, *configs, replies[1], faders, replies[2], faders, replies[3], faders,
+    ])
+    coordinator = CDSPDataUpdateCoordinator(hass, cdsp, timedelta(seconds=10))
+    coordinator.events = CDSPEventDispatcher(hass, "entry", 0.01)
+    events = async_capture_events(hass, EVENT_CAPTURERATE_CHANGED)
+
+    for _ in range(3):
+        await coordinator.async_refresh()
+        await asyncio.sleep(0.02)
+    assert events == []
+
+    await coordinator.async_refresh()
+    await asyncio.sleep(0.02)
+    assert [(event.data["old"], event.data["new"]) for event in events] == [(48000, 44100)]
+    await coordinator.async_shutdown()
+    await cdsp.async_close()
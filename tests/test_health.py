@@ -0,0 +1,14 @@
+"""Tests for the rolling health statistics."""
+from custom_components.camilladsp.health import CDSPHealthStats
+
+
+def test_capturerate_changes_count_nominal_rates() -> None:
+    """Jitter of the measured rate isn't counted, a change of the nominal rate is."""
+    health = CDSPHealthStats()
+    for now, (measured, nominal) in enumerate(
+        [(48003.2, 48000), (47996.8, 48000), (48001.1, 48000), (44098.5, 44100)]
+    ):
+        health.record({"processingload": 20.0, "capturerate": measured}, nominal, now=now)
+
+    assert health.as_dict(now=4)["5m"]["capturerate_changes"] == 1
+    assert health.as_dict(now=4)["5m"]["load_max"] == 20.0
@@ -0,0 +1,34 @@
+"""Tests for the CamillaDSP number entities."""
+from unittest.mock import patch
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from pytest_homeassistant_custom_component.test_util.aiohttp import AiohttpClientMocker
+
+from custom_components.camilladsp.const import DOMAIN
+from custom_components.camilladsp.number import CDSPConfigNumber
+
+from .common import async_setup_instance, mock_camillagui
+
+
+async def test_config_number_follows_source_switch(
+    hass: HomeAssistant, aioclient_mock: AiohttpClientMocker
+) -> None:
+    """After a source switch the config numbers show the values of the new config."""
+    mock_camillagui(aioclient_mock, "a.yml", -3.0)
+    with patch.object(CDSPConfigNumber, "_attr_entity_registry_enabled_default", True):
+        entry = await async_setup_instance(hass)
+
+    entity_id = er.async_get(hass).async_get_entity_id(
+        "number", DOMAIN, f"{entry.entry_id}_config_filters_peq_parameters_gain"
+    )
+    assert hass.states.get(entity_id).state == "-3.0"
+
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    mock_camillagui(aioclient_mock, "b.yml", -6.0)
+    await coordinator.async_select_source("b.yml")
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert hass.states.get(entity_id).state == "-6.0"
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
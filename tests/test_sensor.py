@@ -0,0 +1,36 @@
+"""Tests for the CamillaDSP sensors."""
+import time
+from unittest.mock import patch
+
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from pytest_homeassistant_custom_component.common import async_capture_events
+from pytest_homeassistant_custom_component.test_util.aiohttp import AiohttpClientMocker
+
+from custom_components.camilladsp.const import DOMAIN, HEALTH_ATTRS_INTERVAL
+
+from .common import async_setup_instance, mock_camillagui
+
+
+async def test_health_attributes_throttled(hass: HomeAssistant, aioclient_mock: AiohttpClientMocker) -> None:
+    """Rolling statistics alone don't write the state on every poll."""
+    mock_camillagui(aioclient_mock, load=20.0)
+    entry = await async_setup_instance(hass)
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    entity_id = er.async_get(hass).async_get_entity_id("sensor", DOMAIN, f"{entry.entry_id}_processing_load")
+    events = async_capture_events(hass, EVENT_STATE_CHANGED)
+
+    # Below the status threshold, only the rolling maximum moves.
+    mock_camillagui(aioclient_mock, load=20.5)
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert [event for event in events if event.data["entity_id"] == entity_id] == []
+
+    later = time.monotonic() + HEALTH_ATTRS_INTERVAL
+    with patch("custom_components.camilladsp.sensor.time.monotonic", return_value=later):
+        await coordinator.async_refresh()
+        await hass.async_block_till_done()
+    assert hass.states.get(entity_id).attributes["max_5m"] == 20.5
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
@@ -0,0 +1,78 @@
+"""Tests for the CamillaDSP snapshot and restore services."""
+from unittest.mock import AsyncMock, MagicMock
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import area_registry as ar, device_registry as dr, entity_registry as er
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.camilladsp.const import DOMAIN, SERVICE_RESTORE, SERVICE_SNAPSHOT
+from custom_components.camilladsp.model import CDSPData
+from custom_components.camilladsp.services import async_setup_services
+
+
+def _add_instance(hass: HomeAssistant, name: str, area_id: str | None = None) -> MagicMock:
+    """Register a media player with a stand-in coordinator, return the coordinator."""
+    entry = MockConfigEntry(domain=DOMAIN, title=name, data={})
+    entry.add_to_hass(hass)
+    device = dr.async_get(hass).async_get_or_create(
+        config_entry_id=entry.entry_id, identifiers={(DOMAIN, entry.entry_id)}
+    )
+    if area_id is not None:
+        dr.async_get(hass).async_update_device(device.id, area_id=area_id)
+    er.async_get(hass).async_get_or_create(
+        "media_player", DOMAIN, entry.entry_id, config_entry=entry, device_id=device.id,
+        suggested_object_id=name,
+    )
+
+    coordinator = MagicMock()
+    coordinator.last_update_success = True
+    coordinator.data = CDSPData(state="playing", volume=-20.0, mute=False, source="a.yml",
+                                source_list=("a.yml", "b.yml"), capturerate=48000)
+    coordinator.async_set_volume = AsyncMock()
+    coordinator.async_set_muted = AsyncMock()
+    coordinator.async_select_source = AsyncMock()
+    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
+    return coordinator
+
+
+async def test_snapshot_restore_entity_target(hass: HomeAssistant) -> None:
+    """Only the targeted entity is saved and restored."""
+    async_setup_services(hass)
+    kitchen = _add_instance(hass, "kitchen")
+    _add_instance(hass, "hall")
+
+    response = await hass.services.async_call(
+        DOMAIN, SERVICE_SNAPSHOT, {"entity_id": "media_player.kitchen"}, blocking=True, return_response=True
+    )
+    assert list(response) == ["media_player.kitchen"]
+
+    kitchen.data = CDSPData(state="playing", volume=-10.0, mute=False, source="a.yml",
+                            source_list=("a.yml", "b.yml"), capturerate=48000)
+    response = await hass.services.async_call(
+        DOMAIN, SERVICE_RESTORE, {"entity_id": ["media_player.kitchen"]}, blocking=True, return_response=True
+    )
+    assert response == {"media_player.kitchen": {"result": "restored", "changed": ["volume"]}}
+    kitchen.async_set_volume.assert_awaited_once_with(-20.0)
+
+
+async def test_snapshot_restore_area_target(hass: HomeAssistant) -> None:
+    """An area target only restores the instances in that area."""
+    async_setup_services(hass)
+    area = ar.async_get(hass).async_create("Bar")
+    bar = _add_instance(hass, "bar", area.id)
+    terrace = _add_instance(hass, "terrace")
+
+    await hass.services.async_call(DOMAIN, SERVICE_SNAPSHOT, {}, blocking=True)
+    for coordinator in (bar, terrace):
+        coordinator.data = CDSPData(state="playing", volume=-5.0, mute=True, source="b.yml",
+                                    source_list=("a.yml", "b.yml"), capturerate=48000)
+
+    response = await hass.services.async_call(
+        DOMAIN, SERVICE_RESTORE, {"area_id": area.id}, blocking=True, return_response=True
+    )
+    assert list(response) == ["media_player.bar"]
+    bar.async_select_source.assert_awaited_once_with("a.yml")
+    bar.async_set_volume.assert_awaited_once_with(-20.0)
+    bar.async_set_muted.assert_awaited_once_with(False)
+    terrace.async_select_source.assert_not_awaited()
+    terrace.async_set_volume.assert_not_awaited()
@@ -0,0 +1,45 @@
+"""Tests for the stored last known state."""
+import dataclasses
+from unittest.mock import patch
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from custom_components.camilladsp.model import CDSPData, CDSPFader, CDSPStatus
+from custom_components.camilladsp.store import CDSPStateStore
+
+DATA = CDSPData(state="playing", volume=-20.0, mute=False, source="a.yml", source_list=("a.yml", "b.yml"),
+                capturerate=48000, faders=(CDSPFader(volume=-20.0, mute=False), CDSPFader(volume=-6.0, mute=True)))
+
+
+async def test_only_restored_fields_are_saved(hass: HomeAssistant, hass_storage) -> None:
+    """Status and capture rate changes don't rewrite the store, restored fields do."""
+    store = CDSPStateStore(hass, "entry")
+    with patch.object(Store, "async_delay_save") as delay_save:
+        store.async_schedule_save(DATA)
+        store.async_schedule_save(dataclasses.replace(DATA, capturerate=44100,
+                                                      status=CDSPStatus(processing_load=30.0)))
+        assert delay_save.call_count == 1
+        store.async_schedule_save(dataclasses.replace(DATA, volume=-10.0))
+        assert delay_save.call_count == 2
+        saved = delay_save.call_args.args[0]()
+
+    assert saved == {
+        "state": "playing", "volume": -10.0, "mute": False, "source": "a.yml", "source_list": ["a.yml", "b.yml"],
+        "faders": [{"volume": -20.0, "mute": False}, {"volume": -6.0, "mute": True}],
+    }
+
+
+async def test_load_restores_fields(hass: HomeAssistant, hass_storage) -> None:
+    """A stored state loads without status and capture rate, and isn't saved again unchanged."""
+    store = CDSPStateStore(hass, "entry")
+    with patch.object(Store, "async_load", return_value={
+        "state": "playing", "volume": -20.0, "mute": False, "source": "a.yml", "source_list": ["a.yml", "b.yml"],
+        "faders": [{"volume": -20.0, "mute": False}, {"volume": -6.0, "mute": True}],
+    }):
+        loaded = await store.async_load()
+    assert loaded == dataclasses.replace(DATA, capturerate=0)
+
+    with patch.object(Store, "async_delay_save") as delay_save:
+        store.async_schedule_save(DATA)
+    delay_save.assert_not_called()